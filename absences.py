@@ -0,0 +1,276 @@
+# Nepritomnosti z iCal kalendarov (cache na disku, intervalovy index) bez Streamlitu
+import hashlib
+import io
+import os
+import re
+import time
+from bisect import bisect_right
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, date
+
+from storage import PRIVATE_CALENDAR_URL, ABSENCE_PRECEDENCE, http_client, resource, write_local_json, read_json
+
+ICAL_CACHE_DIR = '.ical_cache'
+# Do tohto veku (s) sa kalendar vobec nestahuje, potom sa overi podmienenym GET
+ICAL_MAX_AGE = int(os.environ.get("MARATHON_ICAL_MAX_AGE", 15 * 60))
+ICAL_FETCH_DEADLINE = 25  # s; pomaly kalendar sa po tomto case nahradi svojou poslednou cache
+ICAL_RETRY_AFTER = 60     # s; po pokuse (aj neuspesnom alebo visiacom) sa zdroj so zastaranou cache hned neskusa znova
+
+# --- KALENDÁR: prúdový čítač VEVENT ---
+ICAL_FIELDS = ("DTSTART", "DTEND", "DURATION", "SUMMARY")
+ICAL_DURATION_RE = re.compile(r'([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?')
+ICAL_UNESCAPE_RE = re.compile(r'\\([\\,;nN])')
+
+def _ical_lines(lines):
+    # Spaja zalomene riadky (pokracovanie zacina medzerou alebo tabulatorom)
+    current = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None: current += line[1:]
+        else:
+            if current is not None: yield current
+            current = line
+    if current is not None: yield current
+
+def _ical_datetime(value):
+    if len(value) >= 15 and value[8] == 'T':
+        return datetime(int(value[:4]), int(value[4:6]), int(value[6:8]), int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    return datetime(int(value[:4]), int(value[4:6]), int(value[6:8]))
+
+def _ical_duration(value):
+    m = ICAL_DURATION_RE.match(value)
+    sign, w, d, h, mi, sec = m.groups() if m else (None, 0, 0, 0, 0, 0)
+    delta = timedelta(weeks=int(w or 0), days=int(d or 0), hours=int(h or 0), minutes=int(mi or 0), seconds=int(sec or 0))
+    return -delta if sign == '-' else delta
+
+def _ical_event(props, start=None, end=None):
+    if "DTSTART" not in props: return None
+    begin = _ical_datetime(props["DTSTART"])
+    if "DTEND" in props: finish = _ical_datetime(props["DTEND"])
+    elif "DURATION" in props: finish = begin + _ical_duration(props["DURATION"])
+    else: finish = begin + timedelta(days=1) if len(props["DTSTART"]) == 8 else begin
+    ev_start, ev_end = begin.date(), finish.date()
+    if (start and ev_end < start) or (end and ev_start > end): return None
+    summary = ICAL_UNESCAPE_RE.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), props.get("SUMMARY", ""))
+    return ev_start, ev_end, summary.strip()
+
+def iter_ical_events(lines, start=None, end=None):
+    # Cita feed po riadkoch a z VEVENT berie iba DTSTART/DTEND/DURATION/SUMMARY;
+    # udalosti mimo okna [start, end] sa zahodia skor, nez sa z nich cokolvek vytvori
+    props, depth = None, 0
+    for line in _ical_lines(lines):
+        if props is None:
+            if line == "BEGIN:VEVENT": props, depth = {}, 0
+            continue
+        if line.startswith("BEGIN:"): depth += 1
+        elif line.startswith("END:"):
+            if depth: depth -= 1
+            else:
+                if event := _ical_event(props, start, end): yield event
+                props = None
+        elif not depth:
+            head, _, value = line.partition(':')
+            if '"' in head:
+                # ':' vnutri parametra v uvodzovkach (napr. ALTREP="http://...")
+                quoted, i = False, 0
+                for i, ch in enumerate(line):
+                    if ch == '"': quoted = not quoted
+                    elif ch == ':' and not quoted: break
+                head, value = line[:i], line[i + 1:]
+            key = head.split(';', 1)[0].upper()
+            if key in ICAL_FIELDS: props[key] = value
+
+# --- KALENDÁR (cache na disku + rozparsované udalosti) ---
+def _parse_ical_events(content, encoding=None):
+    # Feed sa parsuje cely: snapshot (sha obsahu) zdielaju vsetky okna – rozpis, vyhliadka aj predpoved s rocnou historiou –
+    # takze okno sa tu nepouziva a udalosti sa filtruju az v get_ical_events. Telo sa cita po riadkoch priamo z bajtov,
+    # bez response.text (ten pri chybajucom charsete hada kodovanie cez cely feed); iCal je podla RFC 5545 UTF-8.
+    return list(iter_ical_events(io.TextIOWrapper(io.BytesIO(content), encoding=encoding or 'utf-8', errors='replace')))
+
+@resource
+def _ical_memory():
+    # url -> (hash obsahu, udalosti); ak sa hash nezmenil, netreba citat ani JSON snapshot
+    return {}
+
+def _ical_cache_files(url):
+    key = hashlib.sha1(url.encode()).hexdigest()[:16]
+    return tuple(os.path.join(ICAL_CACHE_DIR, f"{key}.{ext}") for ext in ("ics", "meta.json", "events.json"))
+
+def _cached_ical_events(url, digest):
+    memory = _ical_memory()
+    if url in memory and memory[url][0] == digest: return memory[url][1]
+    snap = read_json(_ical_cache_files(url)[2])
+    if not snap or snap.get("sha") != digest: return None
+    events = [(date.fromisoformat(b), date.fromisoformat(e), n) for b, e, n in snap["events"]]
+    memory[url] = (digest, events)
+    return events
+
+def _needs_fetch(meta, max_age):
+    # cache je starsia nez max_age a od posledneho pokusu uplynulo ICAL_RETRY_AFTER
+    now = time.time()
+    return now - meta.get("fetched_at", 0) >= max_age and now - meta.get("attempted_at", 0) >= ICAL_RETRY_AFTER
+
+def load_calendar_events(url, max_age=ICAL_MAX_AGE):
+    raw_file, meta_file, events_file = _ical_cache_files(url)
+    meta = read_json(meta_file) or {}
+    cached = _cached_ical_events(url, meta["sha"]) if meta.get("sha") else None
+    if cached is not None and not _needs_fetch(meta, max_age): return cached
+    # pokus sa zaznamena este pred sietou – aj visiaci zdroj sa tak na dalsich rerunoch neskusa znova
+    meta["attempted_at"] = time.time()
+    write_local_json(meta_file, meta)
+
+    headers = {}
+    if cached is not None:
+        if meta.get("etag"): headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"): headers["If-Modified-Since"] = meta["last_modified"]
+    try:
+        response = http_client().get("calendar", url, headers=headers)
+        if response.status_code != 304: response.raise_for_status()
+    except:
+        if cached is not None: return cached
+        raise
+    meta["fetched_at"] = time.time()
+    if response.status_code == 304:
+        write_local_json(meta_file, meta)
+        return cached
+
+    digest = hashlib.sha256(response.content).hexdigest()
+    meta.update(etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+    events = cached if digest == meta.get("sha") else None
+    if events is None:
+        # Feed sa naozaj zmenil – parsujeme raz a ulozime snapshot
+        events = _parse_ical_events(response.content, response.encoding)
+        try:
+            os.makedirs(ICAL_CACHE_DIR, exist_ok=True)
+            with open(f"{raw_file}.tmp", 'wb') as f: f.write(response.content)
+            os.replace(f"{raw_file}.tmp", raw_file)
+        except: pass
+        write_local_json(events_file, {"sha": digest, "events": [(b.isoformat(), e.isoformat(), n) for b, e, n in events]}, indent=None)
+        _ical_memory()[url] = (digest, events)
+    meta["sha"] = digest
+    write_local_json(meta_file, meta)
+    return events
+
+def classify_absence(raw, rules=None):
+    rules = rules or {}
+    name, typ = raw, rules.get("default_type", "Dovolenka")
+    if rules.get("type"): name, typ = raw.split('-')[0].strip(), rules["type"]
+    elif raw.upper().endswith('PN'): typ, name = "PN", raw[:-2].rstrip(' -')
+    elif raw.upper().endswith('VZ'): typ, name = "Vzdelávanie", raw[:-2].rstrip(' -')
+    elif raw.upper().endswith('S') and not raw.upper().endswith('OS'): typ, name = "Stáž", raw[:-1].rstrip(' -')
+    elif '-' in raw:
+        parts = raw.split('-')
+        name = parts[0].strip()
+    return rules.get("aliases", {}).get(name, name), typ
+
+# --- NEPRÍTOMNOSTI (intervalový index) ---
+class AbsenceIndex:
+    # Nepritomnosti ako intervaly [od, do) pre kazdu osobu, zoradene podla zaciatku.
+    # Pri prekryve vyhrava typ podla `precedence`, potom neskorsia udalost z feedu.
+    def __init__(self, intervals=(), precedence=()):
+        self.rank = {typ: -i for i, typ in enumerate(precedence)}
+        by_person = {}
+        for seq, (person, start, end, typ) in enumerate(intervals):
+            if start < end: by_person.setdefault(person, []).append((start, end, seq, typ))
+        self.people = {}
+        for person, items in by_person.items():
+            items.sort()
+            max_end, running = [], None
+            for _, end, _, _ in items:
+                running = end if running is None or end > running else running
+                max_end.append(running)
+            self.people[person] = ([i[0] for i in items], max_end, items)
+
+    def _hits(self, person, day):
+        starts, max_end, items = self.people[person]
+        i = bisect_right(starts, day) - 1
+        while i >= 0 and max_end[i] > day:
+            if items[i][1] > day: yield items[i]
+            i -= 1
+
+    def on(self, day):
+        # Kto chyba v den `day`: {meno: typ}
+        absent = {}
+        for person in self.people:
+            best = max(self._hits(person, day), key=lambda it: (self.rank.get(it[3], -len(self.rank)), it[2]), default=None)
+            if best: absent[person] = best[3]
+        return absent
+
+    def overlapping(self, start, end):
+        # Intervaly prekryvajuce [start, end) ako (osoba, od, do, typ); obe hranice binarnym vyhladavanim –
+        # max_end je neklesajuce, takze vsetko pred `lo` skoncilo najneskor v `start`
+        found = []
+        for person, (starts, max_end, items) in self.people.items():
+            lo, hi = bisect_right(max_end, start), bisect_right(starts, end - timedelta(days=1))
+            for s_, e_, _, typ in items[lo:hi]:
+                if e_ > start: found.append((person, s_, e_, typ))
+        return sorted(found, key=lambda x: (x[1], x[0]))
+
+class AbsenceDays(Mapping):
+    # Lenivy pohlad {YYYY-MM-DD: {meno: typ}} nad AbsenceIndex v okne [start, end);
+    # dni sa vypocitaju az pri pristupe, nic sa dopredu nerozbaluje
+    def __init__(self, index, start, end):
+        self.index, self.start, self.end = index, start, end
+        self._memo = {}
+
+    def _day(self, day):
+        if day not in self._memo: self._memo[day] = self.index.on(day) if self.start <= day < self.end else {}
+        return self._memo[day]
+
+    def __getitem__(self, date_key):
+        try: absent = self._day(date.fromisoformat(date_key))
+        except (TypeError, ValueError): raise KeyError(date_key)
+        if not absent: raise KeyError(date_key)
+        return absent
+
+    def __iter__(self):
+        spans = sorted((max(s_, self.start), min(e_, self.end)) for _, s_, e_, _ in self.index.overlapping(self.start, self.end))
+        cursor = self.start
+        for s_, e_ in spans:
+            day = max(s_, cursor)
+            while day < e_:
+                yield day.strftime('%Y-%m-%d')
+                day += timedelta(days=1)
+            cursor = max(cursor, e_)
+
+    def __len__(self): return sum(1 for _ in self)
+
+def _calendar_snapshot(url):
+    # Posledne uspesne stiahnute udalosti (bez siete), ak existuju
+    meta = read_json(_ical_cache_files(url)[1]) or {}
+    return _cached_ical_events(url, meta["sha"]) if meta.get("sha") else None
+
+def calendar_versions(calendars=None):
+    # Bez siete, iba z meta suborov cache: (sha obsahu kazdeho zdroja, niektory treba znova stiahnut – pozri _needs_fetch)
+    calendars = calendars or [{"name": "Hlavný kalendár", "url": PRIVATE_CALENDAR_URL}]
+    shas, stale = [], False
+    for src in calendars:
+        meta = read_json(_ical_cache_files(src["url"])[1]) or {}
+        shas.append(meta.get("sha"))
+        stale = stale or _needs_fetch(meta, src.get("max_age", ICAL_MAX_AGE))
+    return tuple(shas), stale
+
+def get_ical_events(start_date, end_date, calendars=None, precedence=ABSENCE_PRECEDENCE):
+    start, end = start_date.date(), end_date.date()
+    calendars = calendars or [{"name": "Hlavný kalendár", "url": PRIVATE_CALENDAR_URL}]
+    # Vsetky zdroje sa stahuju naraz; kazdy ma vlastnu cache, pomaly zdroj neblokuje ostatne
+    pool = ThreadPoolExecutor(max_workers=len(calendars), thread_name_prefix="ical")
+    futures = {pool.submit(load_calendar_events, src["url"], src.get("max_age", ICAL_MAX_AGE)): i for i, src in enumerate(calendars)}
+    wait(futures, timeout=ICAL_FETCH_DEADLINE)
+    pool.shutdown(wait=False)
+    intervals, failed = [], []
+    for future, i in sorted(futures.items(), key=lambda x: x[1]):
+        src = calendars[i]
+        try: events = future.result(timeout=0)
+        except: events = _calendar_snapshot(src["url"])
+        if events is None:
+            failed.append(src.get("name", src["url"]))
+            continue
+        for ev_start, ev_end, raw in events:
+            if ev_end < start or ev_start > end: continue
+            name, typ = classify_absence(raw, src)
+            intervals.append((name, ev_start, ev_end, typ))
+    absences = AbsenceDays(AbsenceIndex(intervals, precedence), start, end)
+    absences.failed_sources = failed
+    return absences
@@ -0,0 +1,145 @@
+# Benchmarky jadra:
+#   python bench.py [--doctors 300] [--weeks 520] [--workers 1 2 4]   – paralelna vyhliadka
+#   python bench.py --mode generate [--weeks 4]                       – generovanie rozpisu (viac oddeleni) podla velkosti
+#   python bench.py --mode startup [--budget 150]                     – importy aplikacie pri starte (python -X importtime)
+import argparse
+import ast
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+from engine import (AMBS_ORDER, DAY_NAMES, ambulance_coverage, compile_config, coverage_pool, parallel_coverage, generate_week,
+                    room_memo)
+
+# (lekari, ambulancie, izby) – posledny bod je cielova velkost pracoviska
+GENERATE_SIZES = [(38, 5, 25), (75, 10, 50), (150, 20, 100), (225, 30, 150), (300, 40, 200)]
+
+# Start aplikacie: importy z MaraThon2.py bez samotneho Streamlitu (ten sa meria zvlast) a moduly,
+# ktore sa pri starte nesmu nacitat – exporty, email, kalendarne kniznice az pri pouziti
+STARTUP_SCRIPT = "MaraThon2.py"
+STARTUP_BUDGET_MS = int(os.environ.get("MARATHON_STARTUP_BUDGET_MS", 150))
+STARTUP_FORBIDDEN = ("pandas", "numpy", "reportlab", "openpyxl", "smtplib", "requests")
+STARTUP_RUNS = 5
+
+def synthetic_config(n_doctors, seed=1, n_ambs=None, n_rooms=None):
+    rng = random.Random(seed)
+    ambs = AMBS_ORDER if n_ambs is None else [f"Amb {i:02d}" for i in range(n_ambs)]
+    # jedno oddelenie na ~50 izieb, izby cislovane v ramci oddelenia
+    n_wards = 1 if n_rooms is None else max(1, round(n_rooms / 50))
+    wards = [f"Oddelenie {w + 1}" if n_rooms else "Oddelenie" for w in range(n_wards)]
+    lekari = {}
+    for i in range(n_doctors):
+        lekari[f"Lekar{i:03d}"] = {"moze": rng.sample(ambs, rng.randint(1, 4)) + ([rng.choice(wards)] if rng.random() < 0.4 else []),
+                                  "nepracuje": rng.sample(DAY_NAMES, 1) if rng.random() < 0.1 else [],
+                                  "active": rng.random() > 0.05}
+    ambulancie = {}
+    for a in ambs:
+        can = [d for d, v in lekari.items() if a in v["moze"]]
+        ambulancie[a] = {"dni": DAY_NAMES, "priority": rng.sample(can, min(len(can), 30))}
+    config = {"lekari": lekari, "ambulancie": ambulancie, "closures": {}}
+    if n_rooms is not None:
+        config["amb_order"] = ambs
+        config["wards"] = [{"name": name, "rt_ambulance": ambs[w % len(ambs)],
+                            "rooms": [[r + 1, rng.randint(1, 3)] for r in range(n_rooms // n_wards)]} for w, name in enumerate(wards)]
+    return config
+
+def synthetic_absences(config, start, weeks, rate, seed=2):
+    rng = random.Random(seed)
+    docs = list(config["lekari"])
+    return {(start + timedelta(days=k)).isoformat(): {d: "PN" for d in rng.sample(docs, int(len(docs) * rate))} for k in range(7 * weeks + 7)}
+
+def bench_outlook(args):
+    config = synthetic_config(args.doctors)
+    start = date(2026, 1, 1)
+    absences = synthetic_absences(config, start, args.weeks, args.absent)
+    print(f"{args.doctors} lekarov, {args.weeks} tyzdnov, {os.cpu_count()} CPU")
+
+    t = time.perf_counter()
+    baseline = list(ambulance_coverage(compile_config(config), {}, absences, start, args.weeks))
+    serial = time.perf_counter() - t
+    print(f"seriovo: {serial:.2f} s")
+    for workers in args.workers:
+        if workers < 2: continue
+        # zahriatie poolu (spawn procesov) sa do merania nepocita
+        list(parallel_coverage(config, absences, start, workers, workers, chunk_weeks=1))
+        t = time.perf_counter()
+        result = list(parallel_coverage(config, absences, start, args.weeks, workers))
+        elapsed = time.perf_counter() - t
+        print(f"{workers} procesy: {elapsed:.2f} s, zrychlenie {serial / elapsed:.2f}x, zhoda {'ano' if result == baseline else 'NIE'}")
+        coverage_pool(workers).shutdown()
+
+def bench_generate(args):
+    # Cas na lekara a den ma s velkostou ostat priblizne konstantny (linearne skalovanie)
+    start = date(2026, 1, 1)
+    first_thursday = start + timedelta(days=(3 - start.weekday()) % 7)
+    print(f"{args.weeks} tyzdnov, absencie {args.absent:.0%}")
+    per_unit = []
+    for n_doctors, n_ambs, n_rooms in GENERATE_SIZES:
+        config = synthetic_config(n_doctors, n_ambs=n_ambs, n_rooms=n_rooms)
+        absences = synthetic_absences(config, start, args.weeks, args.absent)
+        model = compile_config(config)
+        room_memo().clear()
+        t = time.perf_counter()
+        last_day = {}
+        for week in range(args.weeks):
+            *_, last_day = generate_week(config, model, absences, start, first_thursday + timedelta(weeks=week), {}, {}, last_day)
+        elapsed = time.perf_counter() - t
+        per_unit.append(elapsed / (n_doctors * args.weeks * 5))
+        print(f"{n_doctors:4d} lekarov, {n_ambs:3d} ambulancii, {n_rooms:4d} izieb, oddelení {len(model.wards)}: "
+              f"{elapsed:.2f} s, {1e6 * per_unit[-1]:.0f} µs na lekara a den")
+    print(f"najvacsi / najmensi na lekara a den: {per_unit[-1] / per_unit[0]:.2f}x")
+
+def startup_imports(path=STARTUP_SCRIPT):
+    tree = ast.parse(open(path, encoding="utf-8").read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+def import_times(code):
+    # kumulativny cas (ms) importov najvyssej urovne z vystupu -X importtime + moduly, ktore kod vypise na stdout
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode: raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line: continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "): times[name.strip()] = int(cumulative) / 1000
+    return times, proc.stdout.split()
+
+def bench_startup(args):
+    imports = startup_imports()
+    base = [line for line in imports if line.split()[1] == "streamlit"]
+    # moduly nacitane Streamlitom sa aplikacii nepripisuju
+    code = "; ".join(["import sys"] + base + ["_before = set(sys.modules)"] + [line for line in imports if line not in base]
+                     + [f"print(*sorted(m for m in {STARTUP_FORBIDDEN!r} if m in sys.modules and m not in _before))"])
+    runs = [import_times(code) for _ in range(STARTUP_RUNS)]
+    app = {line.split()[1].split(".")[0] for line in imports if line not in base}
+    # medián z behov – prvy beh plati aj kompilaciu .pyc a studenu cache disku
+    own = sorted(sum(ms for name, ms in times.items() if name in app) for times, _ in runs)[STARTUP_RUNS // 2]
+    times, loaded = runs[-1]
+    print(f"streamlit: {times.get('streamlit', 0):.0f} ms, aplikacia: {own:.0f} ms (limit {args.budget} ms)")
+    for name, ms in sorted(((n, ms) for n, ms in times.items() if n in app), key=lambda x: -x[1]): print(f"  {ms:7.1f} ms  {name}")
+    if loaded: print(f"pri starte sa nacitali: {', '.join(loaded)}")
+    return 1 if loaded or own > args.budget else 0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=["outlook", "generate", "startup"], default="outlook")
+    ap.add_argument("--doctors", type=int, default=300)
+    ap.add_argument("--weeks", type=int)
+    ap.add_argument("--absent", type=float)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--budget", type=int, default=STARTUP_BUDGET_MS, help="limit (ms) pre importy aplikacie pri starte")
+    args = ap.parse_args()
+    if args.mode == "startup":
+        return bench_startup(args)
+    if args.mode == "generate":
+        args.weeks, args.absent = args.weeks or 4, 0.1 if args.absent is None else args.absent
+        bench_generate(args)
+    else:
+        args.weeks, args.absent = args.weeks or 520, 0.3 if args.absent is None else args.absent
+        bench_outlook(args)
+
+if __name__ == "__main__": sys.exit(main())
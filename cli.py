@@ -0,0 +1,93 @@
+# Tyzdenny rozpis bez Streamlitu (napr. cron v stredu v noci): kalendare -> rozpis -> PDF/XLSX -> email
+#   python cli.py [--start 2026-10-22] [--out exports] [--to adresa] [--motto text] [--no-email] [--dry-run]
+# Tajomstva z prostredia: MARATHON_GITHUB_TOKEN, MARATHON_EMAIL_USERNAME, MARATHON_EMAIL_PASSWORD
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+# Navratove kody (2 vracia argparse pri zlych argumentoch)
+EXIT_OK, EXIT_ERROR, EXIT_USAGE, EXIT_CALENDAR, EXIT_EMAIL, EXIT_STORAGE = 0, 1, 2, 3, 4, 5
+GIST_FLUSH_TIMEOUT = 60
+
+def next_thursday(today=None):
+    today = today or date.today()
+    return today + timedelta(days=(3 - today.weekday()) % 7)
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Vygeneruje tyzdenny rozpis (stvrtok–streda), ulozi PDF/XLSX a posle ho emailom.")
+    ap.add_argument("--start", type=date.fromisoformat, default=None, help="prvy den (YYYY-MM-DD), predvolene najblizsi stvrtok")
+    ap.add_argument("--out", default="exports", help="priecinok pre PDF a XLSX")
+    ap.add_argument("--to", default=None, help="prijemca (predvolene email_settings.default_to)")
+    ap.add_argument("--motto", default="", help="motto v rozpise")
+    ap.add_argument("--no-email", action="store_true", help="iba ulozit subory")
+    ap.add_argument("--dry-run", action="store_true", help="neukladat historiu izieb ani konfiguraciu a neposielat email")
+    return ap.parse_args(argv)
+
+def log(msg): print(msg, file=sys.stderr)
+
+def run(args):
+    # Tazke moduly (pandas, reportlab, kalendare) sa nacitaju az po spracovani argumentov
+    from storage import SECRETS, ABSENCE_PRECEDENCE, load_config, gist_writer, HistorySession
+    from absences import get_ical_events
+    from planner import generate_data_structure
+    from reports import display_headers, create_display_df, create_excel_report, create_pdf_report
+    from mailer import send_email_with_pdf
+
+    start = args.start or next_thursday()
+    config = load_config(save=not args.dry_run)
+    start_dt = datetime.combine(start, datetime.min.time())
+    absences = get_ical_events(start_dt, start_dt + timedelta(days=14), config.get('calendars'), config.get('absence_precedence', ABSENCE_PRECEDENCE))
+    if absences.failed_sources:
+        # bez kalendara by rozpis ignoroval dovolenky a PN – radsej nic neposielat
+        log(f"Nedostupné kalendáre: {', '.join(absences.failed_sources)}")
+        return EXIT_CALENDAR
+
+    history = HistorySession(save=not args.dry_run)
+    dates, grid, doctors, info, _ = generate_data_structure(config, absences, start, save_hist=not args.dry_run, history=history, manual={})
+    if not args.dry_run: history.commit()
+    df = create_display_df(dates, grid, doctors, info, args.motto, config)
+    df.columns = ["Sekcia / Dátum"] + dates
+    headers = display_headers(config)
+    fn = f"Rozpis_{dates[0]}_{dates[-1]}"
+    pdf = create_pdf_report(df, args.motto, headers=headers)
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, f"{fn}.pdf"), 'wb') as f: f.write(pdf)
+    with open(os.path.join(args.out, f"{fn}.xlsx"), 'wb') as f: f.write(create_excel_report(df, args.motto, headers))
+    log(f"Uložené: {os.path.join(args.out, fn)}.pdf/.xlsx")
+
+    code = EXIT_OK
+    if not (args.no_email or args.dry_run):
+        settings = config.get('email_settings', {})
+        to = args.to or settings.get('default_to')
+        if not to:
+            log("Chýba príjemca (email_settings.default_to alebo --to)")
+            code = EXIT_EMAIL
+        elif send_email_with_pdf(pdf, f"{fn}.pdf", to, settings.get('default_subject', "Rozpis služieb"), settings.get('default_body', "")):
+            log(f"Rozpis odoslaný na {to}")
+        else:
+            log("Chyba pri odosielaní rozpisu" + ("" if "email" in SECRETS else " (chýba MARATHON_EMAIL_USERNAME/PASSWORD)"))
+            code = EXIT_EMAIL
+
+    if history.unreadable:
+        # mesiac, ktory sa nedal precitat, sa neprepisal – inak by sa stratili dni ulozene v giste
+        log(f"Neuložená história izieb (nedá sa načítať): {', '.join(sorted(history.unreadable))}")
+        code = code or EXIT_STORAGE
+    if "github" in SECRETS:
+        # historia izieb sa do gistu zapisuje na pozadi – pred koncom procesu musi dobehnut
+        gist_writer().flush(GIST_FLUSH_TIMEOUT)
+        pending, failed = gist_writer().status()
+        if pending or failed:
+            log(f"Neuložené v Gist: {', '.join(pending + list(failed))}")
+            code = code or EXIT_STORAGE
+    return code
+
+def main(argv=None):
+    args = parse_args(argv)
+    try: return run(args)
+    except KeyboardInterrupt: return EXIT_ERROR
+    except Exception as e:
+        log(f"Chyba: {e!r}")
+        return EXIT_ERROR
+
+if __name__ == "__main__": sys.exit(main())
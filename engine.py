@@ -0,0 +1,779 @@
+# Vypoctove jadro rozpisu bez Streamlitu – importuje ho MaraThon2.py aj procesy paralelnej vyhliadky
+import copy
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from collections import namedtuple, deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+
+DAY_NAMES = ["Pondelok", "Utorok", "Streda", "Stvrtok", "Piatok"]
+# poradie ambulancii vo vyhliadke a simulacii
+SCAN_AMBS = ["Konziliarna", "Velka dispenzarna", "Mala dispenzarna", "Radio 2A", "Radio 2B", "Chemo 8A", "Chemo 8B", "Chemo 8C", "Wolf"]
+AMBS_ORDER = ["Radio 2A", "Radio 2B", "Chemo 8B", "Chemo 8A", "Chemo 8C", "Wolf", "Konziliarna", "Velka dispenzarna", "Mala dispenzarna"]
+# Oddelenia s izbami; lekar patri na oddelenie, ak ma jeho nazov v "moze". Config: "wards" (rovnaky tvar)
+DEFAULT_WARDS = [{"name": "Oddelenie", "head": "Kurisova", "rt_help": "Miklatkova", "rt_ambulance": "Wolf",
+                  "rooms": [[1, 3], [2, 3], [3, 3], [4, 3], [5, 3], [7, 1], [8, 3], [9, 3], [10, 1], [11, 1],
+                            [12, 2], [13, 2], [14, 2], [15, 2], [16, 2], [17, 2], [18, 3], [19, 3]]}]
+# casti konfiguracie, z ktorych sa kompiluje model
+MODEL_KEYS = ("lekari", "ambulancie", "amb_order", "outlook_order", "wards")
+
+# Rozdelenie izieb: "exact" (branch & bound s limitom uzlov, záloha greedy) alebo "greedy".
+# Vysledok urcuje iba limit uzlov (~8 ms); cas je vzdialena poistka – ak zasiahne, vysledok sa nepamata ani neuklada
+ROOM_SOLVER = "exact"
+ROOM_SOLVER_BUDGET_MS = 1000
+ROOM_SOLVER_MAX_NODES = 2000
+ROOM_SEED = os.environ.get("MARATHON_ROOM_SEED", "marathon")
+ROOM_MEMO_SIZE = 4096
+
+# --- KOMPILOVANÝ MODEL KONFIGURÁCIE ---
+# Lekari a ambulancie dostanu celociselne ID; mnoziny lekarov su bitove masky (bit i = doctors[i]).
+# Vsetko, co zavisi iba od dna v tyzdni, je predpocitane v n-ticiach indexovanych weekday 0-4.
+ScheduleModel = namedtuple("ScheduleModel", [
+    "version",
+    "doctors", "doc_id",          # zoradene mena lekarov / meno -> ID
+    "ambulances", "amb_id",       # ambulancie v poradi spracovania / meno -> ID
+    "can",                        # amb ID -> maska lekarov, ktori tam mozu byt
+    "ward",                       # maska lekarov s "Oddelenie"
+    "active",                     # maska aktivnych lekarov
+    "extra_days",                 # "YYYY-MM-DD" -> maska neaktivnych lekarov, ktori v ten den pracuju
+    "off",                        # weekday -> maska lekarov, ktori nepracuju ("nepracuje")
+    "fixed",                      # weekday -> ((doc ID, (ambulancie...)), ...) podla "pevne_dni"
+    "open",                       # weekday -> maska ambulancii, ktore v ten den ordinuju
+    "prio",                       # weekday -> amb ID -> kandidati (ID) v poradi priority, iba tí čo "moze"
+    "wards",                      # oddelenia (Ward) v poradi spracovania
+    "requires",                   # amb ID -> lekar, bez ktoreho je zatvorena ("conditional_owner"; -1 = neznamy), inak None
+    "follows",                    # ((amb ID, lekar, amb ID), ...) – lekar na druhej ambulancii robi aj prvu ("follows")
+    "outlook",                    # ambulancie vo vyhliadke a simulacii v poradi zobrazenia
+])
+# rooms = ((cislo, postele), ...); head = veduca, rt_help = pomoc na RT, rt_amb = ambulancia, ktorej lekar ma menej izieb
+Ward = namedtuple("Ward", ["name", "mask", "rooms", "head", "rt_help", "rt_amb"])
+
+def _ward(w, mask=0):
+    return Ward(w["name"], mask, tuple((int(n), int(b)) for n, b in w.get("rooms", [])), w.get("head"), w.get("rt_help"), w.get("rt_ambulance"))
+
+DEFAULT_WARD = _ward(DEFAULT_WARDS[0])
+
+def model_version(config):
+    return hashlib.sha1(json.dumps([config.get(k) for k in MODEL_KEYS], sort_keys=True).encode()).hexdigest()
+
+def doctor_mask(model, names):
+    mask = 0
+    for n in names:
+        if (i := model.doc_id.get(n)) is not None: mask |= 1 << i
+    return mask
+
+def doctor_names(model, mask):
+    return [model.doctors[i] for i in range(len(model.doctors)) if mask >> i & 1]
+
+def compile_config(config, version=None):
+    lekari, ambulancie = config['lekari'], config['ambulancie']
+    doctors = tuple(sorted(lekari))
+    doc_id = {d: i for i, d in enumerate(doctors)}
+    order = config.get('amb_order') or AMBS_ORDER
+    ambs = tuple(order) + tuple(a for a in ambulancie if a not in order)
+    amb_id = {a: i for i, a in enumerate(ambs)}
+    can = tuple(sum(1 << doc_id[d] for d in doctors if a in lekari[d].get('moze', [])) for a in ambs)
+    wards = tuple(_ward(w, sum(1 << doc_id[d] for d in doctors if w["name"] in lekari[d].get('moze', []))) for w in config.get('wards') or DEFAULT_WARDS)
+    ward = 0
+    for w in wards: ward |= w.mask
+    requires = tuple(doc_id.get(o, -1) if (o := ambulancie.get(a, {}).get('conditional_owner')) else None for a in ambs)
+    follows = tuple((amb_id[a], doc_id[f["doctor"]], amb_id[f["ambulance"]]) for a in ambs
+                    if (f := ambulancie.get(a, {}).get('follows')) and f.get("doctor") in doc_id and f.get("ambulance") in amb_id)
+    outlook = tuple(a for a in config.get('outlook_order') or SCAN_AMBS if a in amb_id)
+    active = sum(1 << doc_id[d] for d in doctors if lekari[d].get('active', True))
+    extra_days = {}
+    for d in doctors:
+        if not lekari[d].get('active', True):
+            for day in lekari[d].get('extra_dni', []): extra_days[day] = extra_days.get(day, 0) | 1 << doc_id[d]
+    off, fixed, open_, prio = [], [], [], []
+    for wd, day_name in enumerate(DAY_NAMES):
+        off.append(sum(1 << doc_id[d] for d in doctors if day_name in lekari[d].get('nepracuje', [])))
+        fixed.append(tuple((doc_id[d], tuple(t.strip() for t in f.split(','))) for d in doctors if (f := lekari[d].get('pevne_dni', {}).get(day_name))))
+        open_.append(sum(1 << i for i, a in enumerate(ambs) if day_name in ambulancie.get(a, {}).get('dni', [])))
+        per_amb = []
+        for i, a in enumerate(ambs):
+            p = ambulancie.get(a, {}).get('priority', [])
+            if isinstance(p, dict): p = p.get(str(wd), p.get('default', []))
+            per_amb.append(tuple(doc_id[d] for d in p if d in doc_id and can[i] >> doc_id[d] & 1))
+        prio.append(tuple(per_amb))
+    return ScheduleModel(version or model_version(config), doctors, MappingProxyType(doc_id), ambs, MappingProxyType(amb_id),
+                         can, ward, active, MappingProxyType(extra_days), tuple(off), tuple(fixed), tuple(open_), tuple(prio),
+                         wards, requires, follows, outlook)
+
+_models = {}
+
+def get_model(config):
+    # Jeden kompilovany model na verziu konfiguracie v procese (UI, CLI aj procesy vyhliadky)
+    version = model_version(config)
+    if version not in _models:
+        if len(_models) > 32: _models.clear()
+        _models[version] = compile_config(config, version)
+    return _models[version]
+
+def match_ambulances(slots):
+    # slots = [(ambulancia, kandidati v poradi priority)] -> {ambulancia: lekar alebo None}
+    # Min-cost max-flow (postupne najkratsie cesty, Bellman-Ford): najprv co najviac obsadenych
+    # ambulancii, potom co najnizsi sucet poradi v priorite
+    docs = sorted({c for _, cands in slots for c in cands})
+    doc_node = {d: len(slots) + 1 + i for i, d in enumerate(docs)}
+    sink = len(slots) + len(docs) + 1
+    graph = [[] for _ in range(sink + 1)]
+
+    def add_edge(u, v, cost):
+        graph[u].append([v, 1, cost, len(graph[v])])
+        graph[v].append([u, 0, -cost, len(graph[u]) - 1])
+
+    for s_i, (_, cands) in enumerate(slots):
+        add_edge(0, s_i + 1, 0)
+        for rank, c in enumerate(cands): add_edge(s_i + 1, doc_node[c], rank)
+    for d in docs: add_edge(doc_node[d], sink, 0)
+
+    while True:
+        dist, back = [None] * (sink + 1), [None] * (sink + 1)
+        dist[0] = 0
+        queue, queued = deque([0]), {0}
+        while queue:
+            u = queue.popleft()
+            queued.discard(u)
+            for e_i, (v, cap, cost, _) in enumerate(graph[u]):
+                if cap and (dist[v] is None or dist[u] + cost < dist[v]):
+                    dist[v], back[v] = dist[u] + cost, (u, e_i)
+                    if v not in queued:
+                        queued.add(v)
+                        queue.append(v)
+        if dist[sink] is None: break
+        v = sink
+        while v:
+            u, e_i = back[v]
+            edge = graph[u][e_i]
+            edge[1] -= 1
+            graph[v][edge[3]][1] += 1
+            v = u
+
+    result = {}
+    for s_i, (amb, cands) in enumerate(slots):
+        used = [v for v, cap, _, _ in graph[s_i + 1] if v != 0 and not cap]
+        result[amb] = docs[used[0] - len(slots) - 1] if used else None
+    return result
+
+def ambulance_coverage(model, closures, absences, start_date, weeks):
+    # Rychla cesta pre vyhliadku: iba pevne dni a ambulancie, bez izieb a bez mriezky lekarov
+    first_thursday = start_date + timedelta(days=(3 - start_date.weekday()) % 7)
+    for week in range(weeks):
+        thursday = first_thursday + timedelta(weeks=week)
+        _, week_mask = week_days(model, thursday)
+        for i in range(7):
+            curr_date = thursday + timedelta(days=i)
+            wd = curr_date.weekday()
+            if wd > 4: continue
+            date_key = curr_date.strftime('%Y-%m-%d')
+            assigned_amb, _, _ = staff_ambulances(model, wd, date_key, absences.get(date_key, {}), closures.get(date_key, []), week_mask)
+            yield curr_date.strftime('%d.%m.%Y'), date_key, assigned_amb
+
+def unfilled_slots(coverage, closures, order=SCAN_AMBS):
+    # (datum, ambulancia) pre kazde neobsadene pracovisko, ktore v ten den nie je zatvorene
+    for date_str, date_key, assigned_amb in coverage:
+        closed_today = closures.get(date_key, [])
+        if "ODDELENIE (Celé)" in closed_today: continue
+        for amb_name in order:
+            if assigned_amb.get(amb_name, "") in ["NEOBSADENÉ", "???", ""] and amb_name not in closed_today:
+                yield date_str, amb_name
+
+def week_days(model, thursday):
+    # pracovne dni tyzdna (stvrtok–streda) a maska lekarov, ktori v nom pracuju
+    week_dates_str = []
+    for i in range(7):
+        d = thursday + timedelta(days=i)
+        if d.weekday() < 5: week_dates_str.append(d.strftime('%Y-%m-%d'))
+    week_mask = model.active
+    for d in week_dates_str: week_mask |= model.extra_days.get(d, 0)
+    return week_dates_str, week_mask
+
+def staff_ambulances(model, wd, date_key, day_absences, closed_today, week_mask):
+    # Pevne dni + obsadenie ambulancii; vrati (ambulancia -> hodnota, volni lekari, pracujuci lekari)
+    working = model.active | model.extra_days.get(date_key, 0)
+    available = working & ~doctor_mask(model, day_absences) & ~model.off[wd]
+    assigned_amb = {}
+    
+    for doc, targets in model.fixed[wd]:
+        if available >> doc & 1:
+            for t in targets:
+                if t in closed_today: assigned_amb[t] = "ZATVORENÉ"
+                else: assigned_amb[t] = model.doctors[doc]
+            available &= ~(1 << doc)
+    
+    amb_scarcity = []
+    for idx, amb_name in enumerate(model.ambulances):
+        if amb_name in assigned_amb or amb_name in closed_today: 
+            if amb_name in closed_today: assigned_amb[amb_name] = "ZATVORENÉ"
+            continue
+        if not model.open[wd] >> idx & 1:
+            assigned_amb[amb_name] = "---"
+            continue
+        if (owner := model.requires[idx]) is not None and (owner < 0 or not available >> owner & 1):
+            assigned_amb[amb_name] = "ZATVORENÉ"
+            continue
+        cands = [d for d in model.prio[wd][idx] if available >> d & 1]
+        amb_scarcity.append((len(cands), idx, cands))
+    
+    amb_scarcity.sort(key=lambda x: (x[0], x[1]))
+    slots = [(idx, cands) for _, idx, cands in amb_scarcity]
+    pending = []
+    for follow_idx, doc, lead_idx in model.follows:
+        # pravidlo plati, ak lekar v tyzdni pracuje, dnes nechyba a nasledna ambulancia sa obsadzuje
+        if not week_mask >> doc & 1 or model.doctors[doc] in day_absences or all(idx != follow_idx for idx, _ in slots): continue
+        if assigned_amb.get(model.ambulances[lead_idx]) == model.doctors[doc]:
+            assigned_amb[model.ambulances[follow_idx]] = model.doctors[doc]
+            slots = [(idx, cands) for idx, cands in slots if idx != follow_idx]
+        else: pending.append((follow_idx, doc, lead_idx))
+    staffed = match_ambulances(slots)
+    for follow_idx, doc, lead_idx in pending:
+        if staffed.get(lead_idx) == doc:
+            # lekar na veducej ambulancii robi aj nasledujucu – zvysok sa obsadi znova bez nej
+            assigned_amb[model.ambulances[follow_idx]] = model.doctors[doc]
+            slots = [(idx, [doc] if idx == lead_idx else cands) for idx, cands in slots if idx != follow_idx]
+            staffed = match_ambulances(slots)
+    for idx, _ in slots:
+        chosen = staffed[idx]
+        if chosen is None:
+            assigned_amb[model.ambulances[idx]] = "NEOBSADENÉ"
+            continue
+        assigned_amb[model.ambulances[idx]] = model.doctors[chosen]
+        available &= ~(1 << chosen)
+    return assigned_amb, available, working
+
+# --- ROZDELENIE IZIEB ---
+@lru_cache(maxsize=64)
+def room_inventory(rooms):
+    # ((cislo, postele), ...) -> postele podla cisla izby (pole) a bitova maska existujucich izieb
+    beds = [0] * (max((r[0] for r in rooms), default=0) + 1)
+    mask = 0
+    for num, b in rooms:
+        beds[num] = b
+        mask |= 1 << num
+    return beds, mask
+
+def _room_cost(assignment, targets, prev_owner):
+    # (odchylka od cielov, prerusena kontinuita, rozptyl izieb) – porovnava sa lexikograficky
+    dev = sum(abs(sum(r[1] for r in rooms) - targets.get(d, 15)) for d, rooms in assignment.items())
+    breaks = sum(1 for d, rooms in assignment.items() for r in rooms if prev_owner.get(r[0], d) != d)
+    spread = sum(max(r[0] for r in rooms) - min(r[0] for r in rooms) for rooms in assignment.values() if rooms)
+    return dev, breaks, spread
+
+class _SolverLimit(Exception): pass
+
+class _SolverTimeout(Exception): pass
+
+def _solve_rooms_exact(doctors_list, targets, pinned, free_rooms, prev_owner, bound, budget_ms):
+    # Branch & bound nad volnymi izbami (podla cisla); vrati (priradenie lepsie nez `bound` alebo None, dobehol v case).
+    # Pri vyprsani casu sa vrati None – greedy je aspon pre rovnaky vstup rovnaky
+    docs = list(doctors_list)
+    n = len(docs)
+    tgt = [targets.get(d, 15) for d in docs]
+    beds = [sum(r[1] for r in pinned[d]) for d in docs]
+    lo = [min((r[0] for r in pinned[d]), default=None) for d in docs]
+    hi = [max((r[0] for r in pinned[d]), default=None) for d in docs]
+    owns = [any(prev_owner.get(r[0]) == d for r in free_rooms) for d in docs]
+    rooms = sorted(free_rooms)
+    owner_of = [docs.index(prev_owner[r[0]]) if prev_owner.get(r[0]) in docs else None for r in rooms]
+    suffix = [0] * (len(rooms) + 1)
+    # own_left[k][i] = postele zvysnych izieb (od k), ktore vcera mal lekar i; released[k] = ich velkosti zostupne
+    own_left, released = [[0] * n for _ in range(len(rooms) + 1)], [[] for _ in range(len(rooms) + 1)]
+    for k in range(len(rooms) - 1, -1, -1):
+        suffix[k] = suffix[k + 1] + rooms[k][1]
+        own_left[k] = list(own_left[k + 1])
+        released[k] = released[k + 1]
+        if owner_of[k] is not None:
+            own_left[k][owner_of[k]] += rooms[k][1]
+            released[k] = sorted(released[k + 1] + [rooms[k][1]], reverse=True)
+    base = _room_cost(pinned, {}, prev_owner)
+    best, choice = [bound, None], [0] * len(rooms)
+    deadline, nodes = time.perf_counter() + budget_ms / 1000, [0]
+
+    def dfs(k, over, under, brk, spread):
+        nodes[0] += 1
+        # limit uzlov je deterministicky (rovnaky vstup = rovnaky vysledok); cas je len poistka
+        if nodes[0] >= ROOM_SOLVER_MAX_NODES: raise _SolverLimit
+        if nodes[0] & 255 == 0 and time.perf_counter() > deadline: raise _SolverTimeout
+        dev_lb, brk_lb = over + abs(under - suffix[k]), brk
+        if dev_lb == best[0][0]:
+            # aby odchylka neprekrocila doterajsie minimum, musia majitelia nad cielom pustit
+            # aspon `need` posteli – kazda pustena izba je prerusena kontinuita
+            need = sum(max(0, beds[i] + own_left[k][i] - tgt[i]) for i in range(n)) - dev_lb
+            for size in released[k]:
+                if need <= 0: break
+                need -= size
+                brk_lb += 1
+        lb = (dev_lb, brk_lb, spread)
+        if lb >= best[0]: return
+        if k == len(rooms):
+            best[0], best[1] = lb, list(choice)
+            return
+        num, b = rooms[k]
+        owner = owner_of[k]
+        # najprv povodny majitel, potom lekari pod cielom, blizsie k svojim izbam
+        order = sorted(range(n), key=lambda i: (i != owner, beds[i] >= tgt[i], num - hi[i] if hi[i] is not None else 99))
+        seen_empty = set()
+        for i in order:
+            if lo[i] is None and not owns[i]:
+                # prazdni lekari s rovnakym cielom su zamenitelni – staci skusit jedneho
+                if tgt[i] in seen_empty: continue
+                seen_empty.add(tgt[i])
+            old_lo, old_hi, old_b = lo[i], hi[i], beds[i]
+            new_b = old_b + b
+            d_over = max(0, new_b - tgt[i]) - max(0, old_b - tgt[i])
+            d_under = max(0, tgt[i] - new_b) - max(0, tgt[i] - old_b)
+            lo[i] = num if old_lo is None or num < old_lo else old_lo
+            hi[i] = num if old_hi is None or num > old_hi else old_hi
+            beds[i] = new_b
+            choice[k] = i
+            dfs(k + 1, over + d_over, under + d_under, brk + (owner is not None and owner != i),
+                spread + (hi[i] - lo[i]) - (old_hi - old_lo if old_lo is not None else 0))
+            beds[i], lo[i], hi[i] = old_b, old_lo, old_hi
+
+    over0 = sum(max(0, b - t) for b, t in zip(beds, tgt))
+    under0 = sum(max(0, t - b) for b, t in zip(beds, tgt))
+    try: dfs(0, over0, under0, base[1], base[2])
+    except _SolverLimit: pass
+    except _SolverTimeout: return None, False
+    if best[1] is None: return None, True
+    result = {d: list(pinned[d]) for d in docs}
+    for k, i in enumerate(best[1]): result[docs[i]].append(rooms[k])
+    return result, True
+
+class RoomMemo:
+    # LRU pamat rozdeleni izieb – rovnake dni (lekari, Wolf, vcerajsok, preferencie) sa nepocitaju znova
+    def __init__(self, maxsize=ROOM_MEMO_SIZE):
+        self.maxsize, self.lock = maxsize, threading.Lock()
+        self.data, self.hits, self.misses = OrderedDict(), 0, 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.data:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return self.data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize: self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self.lock: return {"hits": self.hits, "misses": self.misses, "size": len(self.data), "maxsize": self.maxsize}
+
+_room_memo = RoomMemo()
+
+def room_memo(): return _room_memo
+
+def room_memo_stats(): return room_memo().stats()
+
+def _room_key(doctors_list, wolf_doc_name, previous_assignments, manual_preferences, solver, budget_ms, seed, ward):
+    # Kanonicky tvar vstupu: poradie lekarov ostava (urcuje remizy), zvysok iba pre lekarov z oddelenia
+    docs = tuple(doctors_list)
+    prev = tuple(sorted((d, tuple(rs)) for d, rs in previous_assignments.items() if d in docs and rs))
+    manual = tuple((d, tuple(nums)) for d, nums in manual_preferences.items() if d in docs and nums)
+    return docs, wolf_doc_name, prev, manual, solver, budget_ms, str(seed), (ward.rooms, ward.head, ward.rt_help, ward.rt_amb)
+
+def distribute_rooms(doctors_list, wolf_doc_name, previous_assignments=None, manual_preferences=None, solver=None, budget_ms=None, seed=None, ward=None):
+    # vrati (texty, cisla izieb, stabilny) – nestabilny vysledok (presne riesenie nestihlo casovu poistku) zavisi
+    # od zataze stroja, preto sa nepamata a volajuci ho nema ukladat do historie
+    if not doctors_list: return {}, {}, True
+    ward = ward or DEFAULT_WARD
+    solver = solver or ROOM_SOLVER
+    if budget_ms is None: budget_ms = ROOM_SOLVER_BUDGET_MS
+    if seed is None: seed = ROOM_SEED
+    key = _room_key(doctors_list, wolf_doc_name, previous_assignments or {}, manual_preferences or {}, solver, budget_ms, seed, ward)
+    memo = room_memo()
+    hit, stable = memo.get(key), True
+    if hit is None:
+        # nahoda v kontinuite je odvodena zo seedu a vstupu, takze rovnaky den dava rovnake izby
+        text, raw, stable = _distribute_rooms(list(key[0]), wolf_doc_name, {d: list(rs) for d, rs in key[2]}, {d: list(n) for d, n in key[3]},
+                                              solver, budget_ms, random.Random(repr(key[:-1])), ward)
+        hit = text, raw
+        if stable: memo.put(key, hit)
+    result_text, result_raw = hit
+    return dict(result_text), {d: list(rs) for d, rs in result_raw.items()}, stable
+
+def _distribute_rooms(doctors_list, wolf_doc_name, previous_assignments, manual_preferences, solver, budget_ms, rng, ward):
+    rt_help_doc = ward.rt_help if ward.rt_help in doctors_list else None
+    head_doc = ward.head if ward.head in doctors_list else None
+    room_beds, free = room_inventory(ward.rooms)
+    
+    assignment = {d: [] for d in doctors_list}
+    current_beds = {d: 0 for d in doctors_list}
+    pos_sum = {d: 0 for d in doctors_list}
+    
+    def take(doc, num):
+        nonlocal free
+        free &= ~(1 << num)
+        assignment[doc].append((num, room_beds[num]))
+        current_beds[doc] += room_beds[num]
+        pos_sum[doc] += num
+
+    def is_free(num):
+        return isinstance(num, int) and num >= 0 and free >> num & 1
+    
+    # --- 1. TARGET CALCULATION ---
+    rt_group = [d for d in doctors_list if d == rt_help_doc or d == wolf_doc_name]
+    full_group = [d for d in doctors_list if d not in rt_group and d != head_doc]
+    if head_doc and head_doc not in rt_group and len(full_group) < 2: full_group.append(head_doc)
+    
+    total_beds = sum(room_beds)
+    targets = {}
+    used_by_rt = 0
+    
+    rt_limit = 9 if len(full_group) >= 3 else 12
+    for d in rt_group:
+        targets[d] = rt_limit
+        used_by_rt += targets[d]
+        
+    beds_for_full = total_beds - used_by_rt
+    if full_group:
+        fair_share = min(15, math.floor(beds_for_full / len(full_group)) + 1)
+        for d in full_group: targets[d] = fair_share
+
+    if head_doc and head_doc not in targets: targets[head_doc] = 0
+
+    # --- 2. PREFERENCIE (MANUAL) ---
+    for doc, nums in manual_preferences.items():
+        if doc not in doctors_list: continue
+        my_target = targets.get(doc, 15)
+        for num in nums:
+            if is_free(num) and current_beds[doc] + room_beds[num] <= my_target: take(doc, num)
+
+    pinned = {d: list(rs) for d, rs in assignment.items()}
+    free_after_pins = [(num, room_beds[num]) for num in range(len(room_beds)) if free >> num & 1]
+
+    # --- 3. KONTINUITA (PREVIOUS) ---
+    if previous_assignments:
+        for doc in doctors_list:
+            if doc in previous_assignments:
+                my_prev = [num for num in previous_assignments[doc] if is_free(num)]
+                my_target = targets.get(doc, 15)
+                rng.shuffle(my_prev)
+                for num in my_prev:
+                    if is_free(num) and current_beds[doc] + room_beds[num] <= my_target: take(doc, num)
+
+    # --- 4. DOROVNÁVANIE ---
+    # halda (postele, poradie) – najprv lekari pod cielom, ked dojdu, vsetci. Povodne sa vo fáze "vsetci" zoznam
+    # lekarov stabilne preradoval na mieste, takze posledny obdarovany vyhral remizu s kazdym; to drzi zaporne poradie
+    # (-krok). Preradeny zoznam potom urcoval aj poradie lekarov pre presne riesenie a vystup.
+    order = {d: i for i, d in enumerate(doctors_list)}
+    under = [(current_beds[d], order[d], d) for d in doctors_list if current_beds[d] < targets.get(d, 15)]
+    heapq.heapify(under)
+    everyone, step, popped = None, 0, None
+    while free:
+        if under: heap = under
+        else:
+            if everyone is None:
+                everyone = [(current_beds[d], order[d], d) for d in doctors_list]
+                heapq.heapify(everyone)
+            heap = everyone
+        popped = heapq.heappop(heap)
+        receiver = popped[2]
+        if assignment[receiver]:
+            # najblizsia volna izba k priemeru lekara, pri remize nizsia
+            avgs = pos_sum[receiver] / len(assignment[receiver])
+            f = min(max(math.floor(avgs), -1), len(room_beds))
+            below = free & ((1 << (f + 1)) - 1) if f >= 0 else 0
+            above = free >> (f + 1) << (f + 1)
+            lo = below.bit_length() - 1 if below else None
+            hi = (above & -above).bit_length() - 1 if above else None
+            num = lo if hi is None or (lo is not None and avgs - lo <= hi - avgs) else hi
+        else:
+            num = (free & -free).bit_length() - 1
+        take(receiver, num)
+        if heap is everyone:
+            step += 1
+            order[receiver] = -step
+            heapq.heappush(heap, (current_beds[receiver], order[receiver], receiver))
+        elif current_beds[receiver] < targets.get(receiver, 15):
+            heapq.heappush(heap, (current_beds[receiver], order[receiver], receiver))
+    if everyone is not None:
+        # poradie z posledneho preradenia, teda este pred poslednou pridelenou izbou
+        last = {receiver: popped[:2]} if popped else {}
+        doctors_list = sorted(doctors_list, key=lambda d: last.get(d, (current_beds[d], order[d])))
+
+    # --- 5. PRESNÉ RIEŠENIE (najlepšie v limite uzlov; ak nestihne časovú poistku, ostáva greedy) ---
+    stable = True
+    if solver == "exact":
+        prev_owner = {r: d for d, rs in previous_assignments.items() if d in doctors_list for r in rs}
+        exact, stable = _solve_rooms_exact(doctors_list, targets, pinned, free_after_pins, prev_owner,
+                                           _room_cost(assignment, targets, prev_owner), budget_ms)
+        if exact: assignment = exact
+
+    result_text, result_raw = {}, {}
+    for doc in doctors_list:
+        rooms = sorted(assignment[doc], key=lambda x: x[0])
+        result_raw[doc] = [r[0] for r in rooms]
+        r_str = ", ".join([str(r[0]) for r in rooms])
+        suf = ""
+        if doc == wolf_doc_name: suf = f" + {ward.rt_amb}"
+        elif doc == head_doc and "RT" not in suf: suf = " + RT oddelenie"
+        elif doc == rt_help_doc: suf = " + RT oddelenie"
+        
+        if not rooms:
+             if doc == wolf_doc_name: result_text[doc] = f"{ward.rt_amb} (0L)"
+             elif doc == head_doc: result_text[doc] = "RT oddelenie"
+             elif doc == rt_help_doc: result_text[doc] = "RT oddelenie (0L)"
+             else: result_text[doc] = ""
+        else:
+             result_text[doc] = f"{r_str}{suf}"
+             
+    return result_text, result_raw, stable
+
+# --- GENEROVANIE TÝŽDŇA ---
+def _generate_day(model, wd, date_key, day_absences, closed_today, daily_pref, week_mask, all_doctors, last_day_assignments):
+    # Jeden den: ambulancie, izby kazdeho oddelenia a bunky lekarov;
+    # vrati (stlpec mriezky, izby pre kontinuitu alebo None, stabilny – da sa pamatat a ulozit)
+    column, stable = {}, True
+    assigned_amb, available, working = staff_ambulances(model, wd, date_key, day_absences, closed_today, week_mask)
+
+    for k, v in assigned_amb.items(): column[k] = v
+    
+    room_text_map = {}
+    if "ODDELENIE (Celé)" in closed_today:
+        room_raw_map = None
+        for d in all_doctors: room_text_map[d] = "ZATVORENÉ"
+    else:
+        room_raw_map, taken = {}, 0
+        for ward in model.wards:
+            # lekar na viacerych oddeleniach patri prvemu z nich
+            members = ward.mask & ~taken
+            taken |= ward.mask
+            if ward.name in closed_today:
+                for d in doctor_names(model, members & week_mask): room_text_map[d] = "ZATVORENÉ"
+                for d in doctor_names(model, members):
+                    if d in last_day_assignments: room_raw_map[d] = last_day_assignments[d]
+                continue
+            ward_cands = doctor_names(model, available & members)
+            rt_doc = assigned_amb.get(ward.rt_amb)
+            rt_id = model.doc_id.get(rt_doc)
+            if rt_id is not None and rt_doc not in ward_cands and members >> rt_id & 1:
+                ward_cands.append(rt_doc)
+            text, raw, ward_stable = distribute_rooms(ward_cands, rt_doc, last_day_assignments, daily_pref, ward=ward)
+            stable &= ward_stable
+            room_text_map.update(text)
+            room_raw_map.update(raw)
+    
+    by_doc = {}
+    for a, d in assigned_amb.items(): by_doc.setdefault(d, []).append(a)
+    for doc in all_doctors:
+        if not working >> model.doc_id[doc] & 1:
+            column[doc] = ""
+            continue
+        if doc in day_absences: column[doc] = day_absences[doc]
+        elif doc in room_text_map: column[doc] = room_text_map[doc]
+        else:
+            my = by_doc.get(doc)
+            column[doc] = " + ".join(my) if my else ""
+    return column, room_raw_map, stable
+
+class DayCache(dict):
+    # date_key -> (odtlacok vstupov dna, stlpec mriezky, izby pre kontinuitu); recomputed = dni prepocitane pri poslednom behu
+    def __init__(self):
+        super().__init__()
+        self.recomputed = []
+
+def day_fingerprint(version, week_mask, day_absences, closed_today, last_day_assignments, daily_pref):
+    # Vsetko, od coho zavisi den; zmena izieb predosleho dna sa tak prenesie aj na nasledujuce dni
+    return hashlib.sha1(json.dumps([version, week_mask, dict(day_absences), sorted(closed_today), last_day_assignments, daily_pref],
+                                   sort_keys=True, default=str).encode()).hexdigest()
+
+def generate_week(config, model, absences, start_date, thursday, closures, manual_all, last_day_assignments, session=None, day_cache=None):
+    # Jeden tyzden (stvrtok–streda); izby posledneho dna sa vracaju ako kontinuita pre dalsi tyzden
+    dates, data_grid = [], {}
+    doctors_info = {}
+    week_dates_str, week_mask = week_days(model, thursday)
+    all_doctors = doctor_names(model, week_mask)
+    for d_name in doctor_names(model, week_mask & ~model.active):
+        readable = [datetime.strptime(ed, '%Y-%m-%d').strftime('%d.%m.') for ed in config['lekari'][d_name].get('extra_dni', []) if ed in week_dates_str]
+        doctors_info[d_name] = f"⚠️ len {', '.join(readable)}"
+
+    dates_raw = []
+
+    for i in range(7):
+        curr_date = thursday + timedelta(days=i)
+        wd = curr_date.weekday()
+        if wd > 4: continue
+        date_str = curr_date.strftime('%d.%m.%Y')
+        date_key = curr_date.strftime('%Y-%m-%d')
+        dates.append(date_str)
+        dates_raw.append(date_key)
+        day_absences = absences.get(date_key, {})
+        closed_today = closures.get(date_key, [])
+        daily_pref = manual_all.get(date_key, {})
+        if not daily_pref:
+             start_key = start_date.strftime('%Y-%m-%d')
+             if start_key in manual_all:
+                 daily_pref = manual_all[start_key]
+
+        fp = cached = None
+        if day_cache is not None:
+            fp = day_fingerprint(model.version, week_mask, day_absences, closed_today, last_day_assignments, daily_pref)
+            cached = day_cache.get(date_key)
+        hit = cached is not None and cached[0] == fp
+        if hit:
+            data_grid[date_str], next_rooms, stable = dict(cached[1]), cached[2], True
+        else:
+            data_grid[date_str], next_rooms, stable = _generate_day(model, wd, date_key, day_absences, closed_today, daily_pref, week_mask,
+                                                                    all_doctors, last_day_assignments)
+            if day_cache is not None:
+                if stable: day_cache[date_key] = (fp, dict(data_grid[date_str]), next_rooms)
+                else: day_cache.pop(date_key, None)
+                day_cache.recomputed.append(date_key)
+        if next_rooms is not None:
+            last_day_assignments = next_rooms
+            # nezmeneny den sa neuklada znova – neprepise izby, ktore si uzivatel medzitym ulozil rucne;
+            # nestabilne izby (casova poistka solvera) sa do historie nezapisu
+            if session is not None and not hit and stable: session.put(date_key, next_rooms)
+
+    return dates, data_grid, all_doctors, doctors_info, dates_raw, last_day_assignments
+
+# --- PARALELNÁ VYHLIADKA ---
+_pools, _pools_lock = {}, threading.Lock()
+
+def _absence_slice(absences, start_date, weeks):
+    first_thursday = start_date + timedelta(days=(3 - start_date.weekday()) % 7)
+    days = [(first_thursday + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7 * weeks)]
+    return {d: dict(absences[d]) for d in days if absences.get(d)}
+
+def _coverage_chunk(config, absences, start_date, weeks):
+    return list(ambulance_coverage(get_model(config), config.get('closures', {}), absences, start_date, weeks))
+
+def coverage_pool(workers):
+    # Pool sa drzi medzi volaniami (aj medzi rerunmi Streamlitu); "spawn" je bezpecny aj vedla vlakien servera
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pools[workers]
+
+def parallel_coverage(config, absences, start_date, weeks, workers, chunk_weeks=None):
+    # Rozdeli horizont na bloky tyzdnov, posle ich do procesov s vlastnym vyrezom absencii a spoji podla datumu
+    snapshot = {k: config[k] for k in MODEL_KEYS + ("closures",) if k in config}
+    first_thursday = start_date + timedelta(days=(3 - start_date.weekday()) % 7)
+    chunk_weeks = chunk_weeks or max(1, math.ceil(weeks / (workers * 4)))
+    futures = []
+    for first in range(0, weeks, chunk_weeks):
+        n = min(chunk_weeks, weeks - first)
+        chunk_start = first_thursday + timedelta(weeks=first)
+        futures.append(coverage_pool(workers).submit(_coverage_chunk, snapshot, _absence_slice(absences, chunk_start, n), chunk_start, n))
+    for f in futures: yield from f.result()
+
+# --- SIMULÁCIA VARIANTOV ---
+# Variant = {"name": ..., "lekari": {meno: {pole: hodnota}}, "ambulancie": {meno: {pole: hodnota}}};
+# polia variantu prepisu polia v kopii konfiguracie, ostra konfiguracia sa nemeni ani neuklada.
+def apply_variant(config, variant):
+    cfg = copy.deepcopy({k: config[k] for k in MODEL_KEYS + ("closures",) if k in config})
+    for section in ("lekari", "ambulancie"):
+        for name, fields in variant.get(section, {}).items():
+            cfg[section].setdefault(name, {}).update(copy.deepcopy(fields))
+    return cfg
+
+def priority_variants(config, amb, limit=24):
+    # permutacie priority ambulancie (pri priorite podla dni sa permutuje "default"), bez aktualneho poradia
+    p = config['ambulancie'].get(amb, {}).get('priority', [])
+    current = p.get('default', []) if isinstance(p, dict) else p
+    for perm in itertools.islice((x for x in itertools.permutations(current) if list(x) != current), limit):
+        yield {"name": f"{amb}: {' > '.join(perm)}", "ambulancie": {amb: {"priority": {**p, "default": list(perm)} if isinstance(p, dict) else list(perm)}}}
+
+def _variant_unfilled(config, absences, start_date, weeks):
+    closures, model = config.get('closures', {}), get_model(config)
+    return sum(1 for _ in unfilled_slots(ambulance_coverage(model, closures, absences, start_date, weeks), closures, model.outlook))
+
+def simulate_variants(config, variants, absences, start_date, weeks, workers=1):
+    # Vsetky varianty sa hodnotia nad tym istym vyrezom absencii; vrati (neobsadene v zaklade,
+    # [(nazov, neobsadene, rozdiel oproti zakladu)] zoradene od najlepsieho)
+    absences = _absence_slice(absences, start_date, weeks)
+    configs = [apply_variant(config, {})] + [apply_variant(config, v) for v in variants]
+    if workers > 1:
+        counts = list(coverage_pool(workers).map(_variant_unfilled, configs, itertools.repeat(absences),
+                                                  itertools.repeat(start_date), itertools.repeat(weeks), chunksize=max(1, len(configs) // (workers * 4))))
+    else:
+        counts = [_variant_unfilled(c, absences, start_date, weeks) for c in configs]
+    base = counts[0]
+    ranked = sorted(range(len(variants)), key=lambda i: (counts[i + 1], i))
+    return base, [(variants[i].get("name", f"Variant {i + 1}"), counts[i + 1], counts[i + 1] - base) for i in ranked]
+
+# --- MONTE CARLO PREDPOVEĎ RIZIKA ---
+def absence_rates(model, past_absences, start_date, end_date, prior=4.0):
+    # P(nepritomnost) ako pole [lekar, weekday 0-4, mesiac 0-11] z minulych pracovnych dni;
+    # riedke bunky (mesiac x den) sa stahuju k priemeru lekara pre dany den a ten k celkovemu priemeru
+    import numpy as np   # iba predpoved rizika – start aplikacie ani worker procesy numpy nepotrebuju
+    n = len(model.doctors)
+    absent, days = np.zeros((n, 5, 12)), np.zeros((5, 12))
+    d = start_date
+    while d < end_date:
+        if (wd := d.weekday()) < 5:
+            days[wd, d.month - 1] += 1
+            for name in past_absences.get(d.strftime('%Y-%m-%d'), {}):
+                if (i := model.doc_id.get(name)) is not None: absent[i, wd, d.month - 1] += 1
+        d += timedelta(days=1)
+    overall = (absent.sum(axis=(1, 2)) + 0.5) / (days.sum() + 1)
+    per_wd = (absent.sum(axis=2) + prior * overall[:, None]) / (days.sum(axis=1)[None, :] + prior)
+    return (absent + prior * per_wd[:, :, None]) / (days[None] + prior)
+
+def forecast_risk(model, closures, known_absences, rates, start_date, weeks, scenarios=10000, seed=0):
+    # Pre kazdy den nahodne scenare nepritomnosti (znama absencia z kalendara plati vzdy). Losuje sa iba pre lekarov,
+    # od ktorych obsadenie ambulancii v ten den zavisi; rovnake scenare sa zlucia cez np.unique a obsadenie sa
+    # pocita raz na jedinecny vzor – aj naprieč dnami s rovnakym kontextom.
+    # Vysledok: (datum, kluc, {ambulancia: pravdepodobnost neobsadenia}) pre kazdy pracovny den.
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    follow_mask = sum(1 << doc for _, doc, _ in model.follows)
+    special = follow_mask | sum(1 << d for d in model.requires if d is not None and d >= 0)
+    depends = [special | sum(1 << d for cands in model.prio[wd] for d in cands) | sum(1 << d for d, _ in model.fixed[wd]) for wd in range(5)]
+    first_thursday = start_date + timedelta(days=(3 - start_date.weekday()) % 7)
+    memo = {}
+    for week in range(weeks):
+        thursday = first_thursday + timedelta(weeks=week)
+        _, week_mask = week_days(model, thursday)
+        for i in range(7):
+            curr_date = thursday + timedelta(days=i)
+            wd = curr_date.weekday()
+            if wd > 4: continue
+            date_str, date_key = curr_date.strftime('%d.%m.%Y'), curr_date.strftime('%Y-%m-%d')
+            closed_today = closures.get(date_key, [])
+            working = (model.active | model.extra_days.get(date_key, 0)) & ~model.off[wd]
+            known = doctor_mask(model, known_absences.get(date_key, {})) & working
+            # losuje sa iba pre pracujucich lekarov relevantnych pre ambulancie, ktori este nie su v kalendari
+            free = [j for j in range(len(model.doctors)) if (depends[wd] & working & ~known) >> j & 1]
+            sampled = rng.random((scenarios, len(free))) < rates[free, wd, curr_date.month - 1]
+            if len(free) < 64:
+                codes, counts = np.unique(sampled @ (np.uint64(1) << np.arange(len(free), dtype=np.uint64)), return_counts=True)
+                codes = [int(c) for c in codes]
+            else:
+                rows, counts = np.unique(np.packbits(sampled, axis=1, bitorder='little'), axis=0, return_counts=True)
+                codes = [int.from_bytes(r.tobytes(), 'little') for r in rows]
+            context = (wd, tuple(sorted(closed_today)), model.extra_days.get(date_key, 0), week_mask & follow_mask)
+            unfilled = {}
+            for code, count in zip(codes, counts):
+                mask = known
+                for b, j in enumerate(free):
+                    if code >> b & 1: mask |= 1 << j
+                key = context + (mask,)
+                if key not in memo:
+                    day_absences = dict.fromkeys(doctor_names(model, mask), "PN")
+                    assigned_amb, _, _ = staff_ambulances(model, wd, date_key, day_absences, closed_today, week_mask)
+                    memo[key] = [amb for _, amb in unfilled_slots([(date_str, date_key, assigned_amb)], closures, model.outlook)]
+                for amb in memo[key]: unfilled[amb] = unfilled.get(amb, 0) + int(count)
+            yield date_str, date_key, {amb: c / scenarios for amb, c in unfilled.items()}
@@ -0,0 +1,27 @@
+# Odosielanie exportov emailom (Gmail SMTP); prihlasovacie udaje su v storage.SECRETS["email"]
+from storage import SECRETS
+
+def send_email_with_pdf(pdf_bytes, filename, to_email, subject, body):
+    if "email" not in SECRETS: return False
+    # SMTP a MIME sa nacitaju az pri odoslani
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    from email.mime.base import MIMEBase
+    from email import encoders
+    try:
+        msg = MIMEMultipart()
+        msg['From'], msg['To'], msg['Subject'] = SECRETS["email"]["username"], to_email, subject
+        msg.attach(MIMEText(body, 'plain'))
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(pdf_bytes)
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', f'attachment; filename={filename}')
+        msg.attach(part)
+        server = smtplib.SMTP('smtp.gmail.com', 587)
+        server.starttls()
+        server.login(msg['From'], SECRETS["email"]["password"])
+        server.send_message(msg)
+        server.quit()
+        return True
+    except: return False
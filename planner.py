@@ -0,0 +1,74 @@
+# Generovanie rozpisu, vyhliadka a predpoved rizika nad ulozenou konfiguraciou a kalendarmi (bez Streamlitu)
+import os
+from datetime import datetime, timedelta
+
+from engine import get_model, generate_week, ambulance_coverage, parallel_coverage, unfilled_slots, absence_rates, forecast_risk
+from storage import ABSENCE_PRECEDENCE, HistorySession, closures_in_range
+from absences import get_ical_events
+
+# Vyhliadka: pocet procesov (1 = bez paralelizmu)
+SCAN_WORKERS = int(os.environ.get("MARATHON_SCAN_WORKERS", "1"))
+# Predpoved rizika: pocet scenarov, dni historie na odhad a prah zobrazenia
+FORECAST_SCENARIOS = 10000
+FORECAST_HISTORY_DAYS = 365
+FORECAST_MIN_PROB = 0.05
+
+def generate_data_structure(config, absences, start_date, save_hist=True, history=None, manual=None, day_cache=None):
+    return next(generate_horizon(config, absences, start_date, 1, save_hist, history, manual, day_cache))
+
+def generate_horizon(config, absences, start_date, weeks, save_hist=False, history=None, manual=None, day_cache=None):
+    # Postupne generuje `weeks` tyzdnov (stvrtok–streda) za sebou; model, historia a zatvorenia
+    # sa nacitaju raz a izby z posledneho dna tyzdna sa prenasaju do dalsieho v pamati
+    model = get_model(config)
+    session = history if history is not None else HistorySession()
+    manual_all = manual or {}
+    closures = config.get('closures', {})
+    first_thursday = start_date + timedelta(days=(3 - start_date.weekday()) % 7)
+    last_day_assignments = {}
+    if day_cache is not None: day_cache.recomputed = []
+
+    for week in range(weeks):
+        week_start = start_date + timedelta(weeks=week)
+        thursday = first_thursday + timedelta(weeks=week)
+        # ulozena historia (napr. rucne upravene izby) ma prednost pred vygenerovanym predoslym dnom
+        last_day_assignments = session.get((thursday - timedelta(days=1)).strftime('%Y-%m-%d')) or last_day_assignments
+        *week_data, last_day_assignments = generate_week(config, model, absences, week_start, thursday, closures, manual_all,
+                                                        last_day_assignments, session if save_hist else None, day_cache)
+        # Cudziu session commituje volajuci, vlastnu zapiseme raz za kazdy tyzden
+        if save_hist and history is None: session.commit()
+        yield tuple(week_data)
+
+def scan_future_problems(config, weeks_ahead=12, workers=None):
+    problems = []
+    start = datetime.now()
+    end = start + timedelta(weeks=weeks_ahead)
+    absences = get_ical_events(start, end, config.get('calendars'), config.get('absence_precedence', ABSENCE_PRECEDENCE))
+    closures = closures_in_range(config, start.strftime('%Y-%m-%d'), (end + timedelta(days=7)).strftime('%Y-%m-%d'))
+    workers = SCAN_WORKERS if workers is None else workers
+    if workers > 1:
+        coverage = parallel_coverage(config, absences, start, weeks_ahead + 1, workers)
+    else:
+        coverage = ambulance_coverage(get_model(config), config.get('closures', {}), absences, start, weeks_ahead + 1)
+    for date_str, amb_name in unfilled_slots(coverage, closures, get_model(config).outlook):
+        problems.append({"Dátum": date_str, "Pracovisko": amb_name})
+    if not problems: return None
+    import pandas as pd
+    return pd.DataFrame(problems)
+
+def forecast_future_risk(config, weeks_ahead=12, scenarios=FORECAST_SCENARIOS, seed=0):
+    # Ako vyhliadka, ale k znamym absenciam pridava nahodne podla historickej frekvencie (lekar x den x mesiac)
+    start = datetime.now()
+    end = start + timedelta(weeks=weeks_ahead)
+    past_start = start - timedelta(days=FORECAST_HISTORY_DAYS)
+    calendars, precedence = config.get('calendars'), config.get('absence_precedence', ABSENCE_PRECEDENCE)
+    model = get_model(config)
+    rates = absence_rates(model, get_ical_events(past_start, start, calendars, precedence), past_start.date(), start.date())
+    absences = get_ical_events(start, end, calendars, precedence)
+    closures = closures_in_range(config, start.strftime('%Y-%m-%d'), (end + timedelta(days=7)).strftime('%Y-%m-%d'))
+    rows = []
+    for date_str, _, risk in forecast_risk(model, closures, absences, rates, start, weeks_ahead + 1, scenarios, seed):
+        for amb_name, p in sorted(risk.items(), key=lambda x: -x[1]):
+            if p >= FORECAST_MIN_PROB: rows.append({"Dátum": date_str, "Pracovisko": amb_name, "Riziko (%)": round(100 * p, 1)})
+    if not rows: return None
+    import pandas as pd
+    return pd.DataFrame(rows)
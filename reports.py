@@ -0,0 +1,226 @@
+# Exporty rozpisu (tabulka, XLSX, PDF) bez Streamlitu
+import io
+import os
+from datetime import datetime, timedelta
+
+# pandas, openpyxl a reportlab sa nacitaju az pri exporte – stranky s nastaveniami ich nepotrebuju
+from storage import DISPLAY_SECTIONS, DISPLAY_LABELS, http_client, ward_names
+
+# --- REGISTER UNICODE FONT PRE PDF ---
+def setup_pdf_fonts():
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    font_dir = "/tmp"
+    font_name = "DejaVuSans"
+    font_path = os.path.join(font_dir, f"{font_name}.ttf")
+    try:
+        if os.path.exists(font_path):
+            pdfmetrics.registerFont(TTFont(font_name, font_path))
+            return font_name
+    except: pass
+    
+    if not os.path.exists(font_path):
+        try:
+            font_url = "https://raw.githubusercontent.com/dejavu-fonts/dejavu-fonts/master/ttf/DejaVuSans.ttf"
+            resp = http_client().get("fonts", font_url)
+            resp.raise_for_status()
+            with open(f"{font_path}.tmp", 'wb') as f: f.write(resp.content)
+            os.replace(f"{font_path}.tmp", font_path)
+            pdfmetrics.registerFont(TTFont(font_name, font_path))
+            return font_name
+        except: pass
+    return "Helvetica"
+
+# --- ROZPIS A NEPRÍTOMNOSTI AKO TABUĽKA ---
+def display_headers(config):
+    # riadky, ktore su v rozpise nadpisom (oddelenia a sekcie ambulancii)
+    return ward_names(config) + [title for title, _ in config.get("display_sections", DISPLAY_SECTIONS)]
+
+def build_absence_table(absences, start_d):
+    # Oprava typu vstupu
+    if isinstance(start_d, datetime):
+        current_start_date = start_d.date()
+    else:
+        current_start_date = start_d
+        
+    date_range_start = current_start_date
+    date_range_end = current_start_date + timedelta(days=7)
+    
+    raw_entries = []
+    # Prechadzame iba dni tabulky, nie vsetky kluce v absences
+    d_obj = date_range_start
+    while d_obj <= date_range_end:
+        for person, reason in absences.get(d_obj.strftime('%Y-%m-%d'), {}).items():
+            raw_entries.append({
+                "date": d_obj,
+                "person": person,
+                "reason": reason
+            })
+        d_obj += timedelta(days=1)
+    
+    import pandas as pd
+    if not raw_entries:
+        return pd.DataFrame(columns=["Od - Do", "Lekár", "Dôvod"])
+
+    raw_entries.sort(key=lambda x: (x['person'], x['reason'], x['date']))
+    
+    grouped_rows = []
+    if raw_entries:
+        current_person = raw_entries[0]['person']
+        current_reason = raw_entries[0]['reason']
+        start_date = raw_entries[0]['date']
+        last_date = raw_entries[0]['date']
+
+        for entry in raw_entries[1:]:
+            is_consecutive = (entry['date'] - last_date).days == 1
+            is_same_group = (entry['person'] == current_person and entry['reason'] == current_reason)
+            
+            if is_same_group and is_consecutive:
+                last_date = entry['date']
+            else:
+                date_str = f"{start_date.strftime('%d.%m.')} - {last_date.strftime('%d.%m.%Y')}" if start_date != last_date else f"{start_date.strftime('%d.%m.%Y')}"
+                grouped_rows.append({
+                    "Od - Do": date_str,
+                    "Lekár": current_person,
+                    "Dôvod": current_reason
+                })
+                current_person = entry['person']
+                current_reason = entry['reason']
+                start_date = entry['date']
+                last_date = entry['date']
+
+        date_str = f"{start_date.strftime('%d.%m.')} - {last_date.strftime('%d.%m.%Y')}" if start_date != last_date else f"{start_date.strftime('%d.%m.%Y')}"
+        grouped_rows.append({
+            "Od - Do": date_str,
+            "Lekár": current_person,
+            "Dôvod": current_reason
+        })
+
+    return pd.DataFrame(grouped_rows)
+
+def create_display_df(dates, data_grid, all_doctors, doctors_info, motto, config):
+    import pandas as pd
+    rows = []
+    display_map = config.get("display_labels", DISPLAY_LABELS)
+    listed = set()
+    for ward in ward_names(config):
+        # lekar na viacerych oddeleniach je iba pri prvom (tam ma aj izby)
+        ward_doctors = [d for d in all_doctors if ward in config['lekari'][d].get('moze', []) and d not in listed]
+        listed.update(ward_doctors)
+        rows.append([ward] + dates)
+        for doc in ward_doctors:
+            vals = []
+            for date in dates:
+                val = data_grid[date].get(doc, "")
+                for old, new in display_map.items(): val = val.replace(old, new)
+                vals.append(val)
+            label = f"Dr {doc}" + (f" {doctors_info[doc]}" if doc in doctors_info else "")
+            rows.append([label] + vals)
+    rows.append([motto or "Motto"] + [""] * len(dates))
+    for title, ambs in config.get("display_sections", DISPLAY_SECTIONS):
+        rows.append([title] + dates)
+        for amb in ambs:
+            vals = [data_grid[d].get(amb, "").replace("---", "").replace("NEOBSADENÉ", "???") for d in dates]
+            rows.append([display_map.get(amb, amb)] + vals)
+        rows.append([""] * (len(dates) + 1))
+    return pd.DataFrame(rows)
+
+def create_excel_report(df, motto=None, headers=None):
+    import pandas as pd
+    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+    from openpyxl.utils import get_column_letter
+    headers = set(headers or display_headers({}))
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, header=False, sheet_name="Rozpis")
+        ws = writer.sheets['Rozpis']
+        bold, center, thin = Font(bold=True), Alignment(horizontal="center", vertical="center", wrap_text=True), Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+        ws.cell(1, 1, f"Rozpis prác Onkologická klinika {df.columns[1]} - {df.columns[-1]}").font = bold
+        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(df.columns))
+        ws['A1'].alignment = center
+        for r, row in enumerate(df.iterrows(), 2):
+            is_header = row[1].iloc[0] in headers
+            is_motto = (row[1].iloc[0] == (motto or "Motto"))
+            for c, val in enumerate(row[1], 1):
+                cell = ws.cell(r, c, val)
+                cell.border = thin
+                cell.alignment = center
+                if is_header or (c==1 and not is_motto): cell.font = bold
+                if is_motto:
+                    ws.merge_cells(start_row=r, start_column=1, end_row=r, end_column=len(df.columns))
+                    cell.font, cell.fill = Font(bold=True, italic=True), PatternFill(start_color="EEEEEE", end_color="EEEEEE", fill_type="solid")
+                    ws.row_dimensions[r].height = 25
+                    break
+        ws.column_dimensions['A'].width = 25
+        for i in range(2, len(df.columns) + 1): ws.column_dimensions[get_column_letter(i)].width = 18
+    return output.getvalue()
+
+def create_pdf_report(df, motto, title_prefix="Rozpis prác", headers=None):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    buffer = io.BytesIO()
+    font_name = setup_pdf_fonts()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4), rightMargin=10, leftMargin=10, topMargin=10, bottomMargin=10)
+    styles = getSampleStyleSheet()
+    cell_style = ParagraphStyle('C', parent=styles['Normal'], fontName=font_name, fontSize=7, leading=8, alignment=1)
+    
+    # Pre absencie pouzivame inu strukturu, pre rozpis inu
+    # Ak je to absencna tabulka, je jednoduchsia
+    if "Od - Do" in df.columns:
+        # Absencna tabulka ma menej stlpcov
+        data = [[Paragraph(str(c), ParagraphStyle('H', parent=styles['Normal'], fontName=font_name, fontSize=8, alignment=1)) for c in df.columns]]
+        for _, row in df.iterrows():
+            row_data = []
+            for val in row.values:
+                row_data.append(Paragraph(str(val), cell_style))
+            data.append(row_data)
+        
+        # Sirky stlpcov pre absencie
+        col_widths = [150, 200, 200]
+        if len(df.columns) != 3: col_widths = None # fallback
+        
+        t = Table(data, colWidths=col_widths)
+        style = TableStyle([
+            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+            ('BACKGROUND', (0,0), (-1,0), colors.lightgrey)
+        ])
+        t.setStyle(style)
+        
+        # Titulok bez datumu, kedze ten je v riadkoch
+        doc.build([Paragraph(f"{title_prefix}", styles['Title']), t])
+        
+    else:
+        # Klasicky rozpis
+        data = [[Paragraph(str(c), ParagraphStyle('H', parent=styles['Normal'], fontName=font_name, fontSize=8, alignment=1)) for c in df.columns]]
+        for _, row in df.iterrows():
+            row_data = []
+            is_motto = (row.iloc[0] == (motto or "Motto"))
+            for i, val in enumerate(row.values):
+                txt = str(val) if val else ""
+                if is_motto and i==0: 
+                    p = Paragraph(f"<para align='center'><b><i>{txt}</i></b></para>", ParagraphStyle('M', parent=cell_style, fontSize=9, padding=6, alignment=1))
+                elif is_motto: p = ""
+                elif i==0: p = Paragraph(f"<b>{txt}</b>", cell_style)
+                else: p = Paragraph(txt, cell_style)
+                row_data.append(p)
+            data.append(row_data)
+        
+        headers = set(headers or display_headers({}))
+        t = Table(data, colWidths=[130] + [135]*(len(df.columns)-1))
+        style = TableStyle([('GRID', (0,0), (-1,-1), 0.5, colors.black), ('VALIGN', (0,0), (-1,-1), 'MIDDLE'), ('BACKGROUND', (0,0), (-1,0), colors.grey)])
+        for i, row in enumerate(df.iterrows()):
+            if row[1].iloc[0] in headers:
+                style.add('BACKGROUND', (0, i+1), (-1, i+1), colors.lightgrey)
+            if row[1].iloc[0] == (motto or "Motto"):
+                style.add('SPAN', (0, i+1), (-1, i+1))
+                style.add('BACKGROUND', (0, i+1), (-1, i+1), colors.whitesmoke)
+                style.add('ALIGN', (0, i+1), (-1, i+1), 'CENTER')
+        t.setStyle(style)
+        
+        doc.build([Paragraph(f"{title_prefix} {df.columns[1]} - {df.columns[-1]}", styles['Title']), t])
+        
+    buffer.seek(0)
+    return buffer.getvalue()
@@ -0,0 +1,727 @@
+# Ulozisko rozpisu bez Streamlitu: konfiguracia, historia izieb, gist, SQLite a HTTP klient.
+# Pouziva ho MaraThon2.py aj cli.py; tajomstva nastavi Streamlit (set_secrets) alebo prostredie.
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import atexit
+from collections.abc import Mapping
+
+from engine import AMBS_ORDER, SCAN_AMBS, DEFAULT_WARDS, get_model
+
+# --- KONFIGURÁCIA ---
+CONFIG_FILE = 'hospital_config.json'
+HISTORY_FILE = 'room_history.json'
+PRIVATE_CALENDAR_URL = "https://calendar.google.com/calendar/ical/fntnonk%40gmail.com/private-e8ce4e0639a626387fff827edd26b87f/basic.ics"
+# Pri prekryve viacerych neprítomností v ten istý deň vyhráva typ vyššie v zozname
+ABSENCE_PRECEDENCE = ["PN", "Vzdelávanie", "Stáž", "Dovolenka"]
+GIST_FILENAME_CONFIG = "hospital_config_v26.json"
+GIST_FILENAME_HISTORY = "room_history_v26.json"
+# História je rozdelená po mesiacoch: room_history/2025-12.json + gist room_history_v26_2025-12.json
+HISTORY_DIR = 'room_history'
+GIST_HISTORY_PREFIX = "room_history_v26"
+# Úložisko: "json" (lokálne JSON + gist) alebo "sqlite" (gist slúži len na export/import)
+STORAGE_BACKEND = os.environ.get("MARATHON_STORAGE", "json")
+DB_FILE = os.environ.get("MARATHON_DB", "marathon.db")
+# Rozpis: sekcie ambulancii (nadpis, ambulancie) a zobrazovane nazvy; v configu "display_sections" / "display_labels"
+DISPLAY_SECTIONS = [["Konziliárna amb", ["Konziliarna"]], ["RT ambulancie", ["Radio 2A", "Radio 2B"]], ["Chemo amb", ["Chemo 8A", "Chemo 8B", "Chemo 8C"]],
+                    ["Disp. Ambulancia", ["Velka dispenzarna", "Mala dispenzarna"]], ["RTG Terapia", ["Wolf"]]]
+DISPLAY_LABELS = {"Radio 2A": "Radio 2A", "Konziliarna": "Konziliárna amb.", "Velka dispenzarna": "veľký dispenzár", "Mala dispenzarna": "malý dispenzár"}
+
+# --- TAJOMSTVÁ ---
+# CLI ich cita z prostredia, Streamlit ich prepise obsahom st.secrets
+SECRET_ENV = {("github", "token"): "MARATHON_GITHUB_TOKEN", ("email", "username"): "MARATHON_EMAIL_USERNAME",
+              ("email", "password"): "MARATHON_EMAIL_PASSWORD"}
+
+def secrets_from_env():
+    secrets = {}
+    for (section, key), var in SECRET_ENV.items():
+        if os.environ.get(var): secrets.setdefault(section, {})[key] = os.environ[var]
+    return secrets
+
+SECRETS = secrets_from_env()
+
+def set_secrets(secrets):
+    # prevezmu sa iba sekcie ([github], [email]); skalarne kluce na najvyssej urovni (APP_PASSWORD = "x") sa preskocia
+    for section, values in secrets.items():
+        if isinstance(values, Mapping): SECRETS[section] = dict(values)
+
+# --- ZDIEĽANÉ INŠTANCIE ---
+def resource(factory):
+    # Jedna instancia na proces (ako st.cache_resource; modul prezije reruny Streamlitu)
+    lock, box = threading.Lock(), []
+    def get():
+        if not box:
+            with lock:
+                if not box: box.append(factory())
+        return box[0]
+    get.ready = lambda: bool(box)
+    return get
+
+# --- HTTP KLIENT (pool, timeouty, retry, circuit breaker) ---
+# (connect, read) timeout v sekundach pre kazdy endpoint
+HTTP_TIMEOUTS = {"github": (3.05, 15), "calendar": (3.05, 20), "fonts": (3.05, 30)}
+HTTP_RETRIES = 2
+BREAKER_THRESHOLD = 3   # po tolkych zlyhaniach za sebou sa endpoint docasne vypne
+BREAKER_COOLDOWN = 60   # sekundy, kym sa endpoint znova skusi
+
+class CircuitOpenError(ConnectionError): pass
+
+class HttpClient:
+    def __init__(self):
+        # requests sa nacita az pri prvom sietovom volani (gist, kalendar, font), nie pri starte aplikacie
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        self.session = requests.Session()
+        retry = Retry(total=HTTP_RETRIES, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({"GET", "HEAD", "PATCH"}))
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def _endpoint(self, endpoint):
+        return self.stats.setdefault(endpoint, {"calls": 0, "failures": 0, "rejected": 0, "total_ms": 0.0, "max_ms": 0.0, "streak": 0, "open_until": 0.0})
+
+    def request(self, endpoint, method, url, **kwargs):
+        with self.lock:
+            ep = self._endpoint(endpoint)
+            if time.monotonic() < ep["open_until"]:
+                ep["rejected"] += 1
+                raise CircuitOpenError(f"{endpoint}: circuit open")
+        kwargs.setdefault("timeout", HTTP_TIMEOUTS.get(endpoint, (3.05, 15)))
+        t0, failed = time.perf_counter(), True
+        try:
+            resp = self.session.request(method, url, **kwargs)
+            failed = resp.status_code >= 500
+            return resp
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            with self.lock:
+                ep["calls"] += 1
+                ep["total_ms"] += ms
+                ep["max_ms"] = max(ep["max_ms"], ms)
+                if failed:
+                    ep["failures"] += 1
+                    ep["streak"] += 1
+                    if ep["streak"] >= BREAKER_THRESHOLD: ep["open_until"] = time.monotonic() + BREAKER_COOLDOWN
+                else: ep["streak"], ep["open_until"] = 0, 0.0
+
+    def get(self, endpoint, url, **kwargs): return self.request(endpoint, "GET", url, **kwargs)
+
+    def snapshot(self):
+        with self.lock:
+            now = time.monotonic()
+            return {name: {"calls": ep["calls"], "failures": ep["failures"], "rejected": ep["rejected"],
+                           "avg_ms": round(ep["total_ms"] / ep["calls"], 1) if ep["calls"] else 0.0,
+                           "max_ms": round(ep["max_ms"], 1), "open": now < ep["open_until"]}
+                    for name, ep in self.stats.items()}
+
+@resource
+def http_client(): return HttpClient()
+
+def http_stats(): return http_client().snapshot() if http_client.ready() else {}
+
+# --- LOKÁLNE JSON SÚBORY ---
+def write_local_json(path, data, indent=2):
+    # Atomicky zapis: docasny subor + rename, pad nemoze nechat rozpisany JSON
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except: pass
+
+def read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f: return json.load(f)
+    except: return None
+
+# --- GIST ULOŽISKO ---
+GIST_API = "https://api.github.com/gists"
+GIST_IDS_FILE = 'gist_ids.json'
+GIST_CACHE_DIR = '.gist_cache'
+
+def _gist_headers():
+    return {"Authorization": f"token {SECRETS['github']['token']}"}
+
+@resource
+def _gist_id_cache():
+    # filename -> gist id, zdielane medzi rerunmi; pri starte sa doplni z disku
+    cache = {}
+    if os.path.exists(GIST_IDS_FILE):
+        try:
+            with open(GIST_IDS_FILE, 'r', encoding='utf-8') as f: cache.update(json.load(f))
+        except: pass
+    return cache
+
+def _remember_gist_id(filename, gist_id):
+    # None = subor zatial v ziadnom giste nie je; citania to neoveruju znova, pred vytvorenim gistu sa vsak
+    # zoznam prejde este raz (subor mohol medzitym vytvorit iny proces, napr. cron). Na disk iba zname ID.
+    cache = _gist_id_cache()
+    cache[filename] = gist_id
+    write_local_json(GIST_IDS_FILE, {k: v for k, v in cache.items() if v})
+
+def _find_gist_id(filename):
+    # Prechadza vsetky stranky zoznamu gistov (per_page max 100)
+    url = f"{GIST_API}?per_page=100"
+    while url:
+        resp = http_client().get("github", url, headers=_gist_headers())
+        resp.raise_for_status()
+        for gist in resp.json():
+            if filename in gist['files']: return gist['id']
+        url = resp.links.get('next', {}).get('url')
+    return None
+
+def _lookup_gist_id(filename, refresh=False):
+    # None = gist so suborom neexistuje; chyba siete sa neprekryva
+    cache = _gist_id_cache()
+    if not refresh and filename in cache: return cache[filename]
+    gist_id = _find_gist_id(filename)
+    _remember_gist_id(filename, gist_id)
+    return gist_id
+
+def get_gist_id(filename, refresh=False):
+    if "github" not in SECRETS: return None
+    try: return _lookup_gist_id(filename, refresh)
+    except: return None
+
+def _gist_cache_file(gist_id): return os.path.join(GIST_CACHE_DIR, f"{gist_id}.json")
+
+def _read_gist_cache(gist_id):
+    try:
+        with open(_gist_cache_file(gist_id), 'r', encoding='utf-8') as f: return json.load(f)
+    except: return None
+
+def _cache_gist_response(gist_id, resp):
+    # Ulozi ETag + obsah suborov; skratene (truncated) subory sa dotiahnu cez raw_url
+    files = {}
+    for name, f in resp.json()['files'].items():
+        if f.get('truncated') or f.get('content') is None:
+            raw = http_client().get("github", f['raw_url'], headers=_gist_headers())
+            raw.raise_for_status()
+            files[name] = raw.text
+        else: files[name] = f['content']
+    if etag := resp.headers.get('ETag'): write_local_json(_gist_cache_file(gist_id), {"etag": etag, "files": files}, indent=None)
+    return files
+
+def _fetch_gist_files(gist_id):
+    # Podmieneny GET: nezmeneny gist vrati 304 a obsah sa berie z lokalnej cache
+    headers, cached = _gist_headers(), _read_gist_cache(gist_id)
+    if cached: headers["If-None-Match"] = cached["etag"]
+    resp = http_client().get("github", f"{GIST_API}/{gist_id}", headers=headers)
+    if resp.status_code == 304 and cached: return cached["files"]
+    if resp.status_code == 404: return None
+    resp.raise_for_status()
+    return _cache_gist_response(gist_id, resp)
+
+def _gist_file_request(method, filename, **kwargs):
+    # Ulozene ID sa overi znova iba ak GitHub vrati 404 (gist zmazany / presunuty)
+    gist_id = get_gist_id(filename)
+    if not gist_id: return None, None
+    resp = http_client().request("github", method, f"{GIST_API}/{gist_id}", headers=_gist_headers(), **kwargs)
+    if resp.status_code == 404:
+        gist_id = get_gist_id(filename, refresh=True)
+        if not gist_id: return None, None
+        resp = http_client().request("github", method, f"{GIST_API}/{gist_id}", headers=_gist_headers(), **kwargs)
+    resp.raise_for_status()
+    return gist_id, resp
+
+def _read_gist_file(filename):
+    # None = subor v gistoch nie je (overene na GitHube); ked GitHub neodpovie, vyhodi vynimku
+    gist_id = _lookup_gist_id(filename)
+    if not gist_id: return None
+    files = _fetch_gist_files(gist_id)
+    if files is None or filename not in files:
+        gist_id = _lookup_gist_id(filename, refresh=True)
+        if not gist_id: return None
+        files = _fetch_gist_files(gist_id)
+        if files is None or filename not in files: return None
+    return json.loads(files[filename])
+
+def load_data_from_gist(filename):
+    if "github" not in SECRETS: return None
+    try: return _read_gist_file(filename)
+    except: return None
+
+def _upload_to_gist(filename, content):
+    payload = {
+        "description": f"Storage for {filename}",
+        "public": False,
+        "files": { filename: {"content": content} }
+    }
+    gist_id, resp = _gist_file_request("PATCH", filename, json=payload)
+    if resp is None:
+        # zapamatane "ziadny gist" moze byt zastarane – novy gist sa zalozi, iba ak ho nenajde ani cerstvy zoznam
+        if gist_id := _lookup_gist_id(filename, refresh=True):
+            resp = http_client().request("github", "PATCH", f"{GIST_API}/{gist_id}", json=payload, headers=_gist_headers())
+        else:
+            resp = http_client().request("github", "POST", GIST_API, json=payload, headers=_gist_headers())
+        resp.raise_for_status()
+        if not gist_id:
+            gist_id = resp.json()['id']
+            _remember_gist_id(filename, gist_id)
+    _cache_gist_response(gist_id, resp)
+
+def save_data_to_gist(filename, data):
+    # Upload bezi na pozadi (GistWriter), UI na GitHub necaka
+    if "github" not in SECRETS: return
+    gist_writer().submit(filename, json.dumps(data, ensure_ascii=False, indent=2))
+
+# --- ASYNCHRÓNNE UKLADANIE DO GISTU ---
+class GistWriter:
+    # Jedno vlakno na pozadi; opakovane ulozenia toho isteho suboru sa zlucia do jedneho uploadu
+    def __init__(self):
+        self.pending, self.failed = {}, {}
+        self.busy = None
+        self.cond = threading.Condition()
+        threading.Thread(target=self._run, name="gist-writer", daemon=True).start()
+        atexit.register(self.flush, 30)
+
+    def submit(self, filename, content):
+        with self.cond:
+            self.pending[filename] = content
+            self.failed.pop(filename, None)
+            self.cond.notify_all()
+
+    def peek(self, filename):
+        # Posledna neodoslana verzia suboru (ma prednost pred obsahom gistu)
+        with self.cond:
+            if filename in self.pending: return self.pending[filename]
+            if self.busy and self.busy[0] == filename: return self.busy[1]
+            if filename in self.failed: return self.failed[filename][0]
+        return None
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending: self.cond.wait()
+                filename = next(iter(self.pending))
+                self.busy = (filename, self.pending.pop(filename))
+            try: _upload_to_gist(*self.busy)
+            except Exception as e:
+                with self.cond:
+                    if filename not in self.pending: self.failed[filename] = (self.busy[1], str(e))
+            finally:
+                with self.cond:
+                    self.busy = None
+                    self.cond.notify_all()
+
+    def retry_failed(self):
+        with self.cond:
+            for filename, (content, _) in self.failed.items(): self.pending.setdefault(filename, content)
+            self.failed = {}
+            self.cond.notify_all()
+
+    def flush(self, timeout=None):
+        with self.cond: return self.cond.wait_for(lambda: not self.pending and self.busy is None, timeout)
+
+    def status(self):
+        with self.cond:
+            pending = list(self.pending) + ([self.busy[0]] if self.busy else [])
+            return pending, {k: err for k, (_, err) in self.failed.items()}
+
+@resource
+def gist_writer(): return GistWriter()
+
+def _load_data(gist_filename, local_filename, default_factory):
+    if "github" in SECRETS and (pending := gist_writer().peek(gist_filename)) is not None: return json.loads(pending)
+    data = load_data_from_gist(gist_filename)
+    if data is not None: return data
+    if os.path.exists(local_filename):
+        try:
+            with open(local_filename, 'r', encoding='utf-8') as f: return json.load(f)
+        except: pass
+    return default_factory()
+
+def load_config(save=True):
+    # save=False (cli --dry-run): migracie sa pouziju iba v pamati, nic sa neulozi
+    if STORAGE_BACKEND == "sqlite": config = db_load_config()
+    else: config = _load_data(GIST_FILENAME_CONFIG, CONFIG_FILE, get_default_config)
+    config, changed = migrate_homolova_to_vidulin(config)
+    changed = migrate_to_data_driven(config) or changed
+    if 'closures' not in config:
+        config['closures'] = {}
+        changed = True
+    
+    # Pridanie sekcie pre absencie, ak chyba
+    if 'email_settings_absences' not in config:
+        config['email_settings_absences'] = { 
+            "default_to": "", 
+            "default_subject": "Prehľad neprítomností", 
+            "default_body": "Dobrý deň,\nv prílohe posielam prehľad neprítomností." 
+        }
+        changed = True
+
+    if 'calendars' not in config:
+        config['calendars'] = [{"name": "Hlavný kalendár", "url": PRIVATE_CALENDAR_URL}]
+        changed = True
+        
+    if changed and save: save_config(config)
+    get_model(config)
+    return config
+
+def save_config(config):
+    if STORAGE_BACKEND == "sqlite": return db_save_config(config)
+    write_local_json(CONFIG_FILE, config)
+    save_data_to_gist(GIST_FILENAME_CONFIG, config)
+
+def save_doctor(config, name):
+    # Zmena jedneho lekara: v SQLite jeden riadok, v JSON rezime cely config
+    if STORAGE_BACKEND == "sqlite": return db_save_doctor(name, config['lekari'][name])
+    save_config(config)
+
+def closures_in_range(config, start_key, end_key):
+    if STORAGE_BACKEND == "sqlite": return db_closures_in_range(start_key, end_key)
+    return {k: v for k, v in config.get('closures', {}).items() if start_key <= k <= end_key}
+
+# --- HISTÓRIA IZIEB (mesačné shardy) ---
+def _shard_files(month):
+    return os.path.join(HISTORY_DIR, f"{month}.json"), f"{GIST_HISTORY_PREFIX}_{month}.json"
+
+def _read_history_file(name):
+    # Neodoslana verzia, gist, inak lokalny subor; None = subor nikde nie je. Ak sa gist nepodari precitat,
+    # vyhodi vynimku – lokalna kopia moze byt starsia a jej zapis by prepisal dni, ktore su iba v giste
+    local_file, gist_file = _shard_files(name)
+    if "github" in SECRETS:
+        if (pending := gist_writer().peek(gist_file)) is not None: return json.loads(pending)
+        if (data := _read_gist_file(gist_file)) is not None: return data
+    return read_json(local_file)
+
+def load_history_shard(month):
+    if STORAGE_BACKEND == "sqlite": return db_load_history_range(f"{month}-01", f"{month}-31")
+    return _read_history_file(month) or {}
+
+def save_history_shard(month, shard, days=None):
+    if STORAGE_BACKEND == "sqlite": return db_save_history_days(shard, shard.keys() if days is None else days)
+    local_file, gist_file = _shard_files(month)
+    write_local_json(local_file, shard)
+    save_data_to_gist(gist_file, shard)
+
+def _local_history_months():
+    # mesiace s lokalnym shardom – aj tie, ktore sa zapisali, ked index nebol dostupny
+    try: return {f[:-5] for f in os.listdir(HISTORY_DIR) if f.endswith(".json") and f != "index.json"}
+    except: return set()
+
+def load_history_index():
+    # None iba ak index urcite neexistuje; pri chybe citania vyhodi vynimku (mesiace z gistu by inak vypadli)
+    return _read_history_file("index")
+
+def save_history_index(months):
+    local_file, gist_file = _shard_files("index")
+    index = {"months": sorted(months)}
+    write_local_json(local_file, index)
+    save_data_to_gist(gist_file, index)
+
+def _legacy_history_shards():
+    shards = {}
+    for date_key, room_map in _load_data(GIST_FILENAME_HISTORY, HISTORY_FILE, lambda: {}).items():
+        shards.setdefault(date_key[:7], {})[date_key] = room_map
+    return shards
+
+def migrate_history_to_shards():
+    if STORAGE_BACKEND == "sqlite": return db_history_months()
+    # Jednorazovo rozdeli povodny room_history.json / room_history_v26.json na mesacne shardy;
+    # iba ak index preukazatelne chyba (chyba citania sa posunie volajucemu)
+    index = load_history_index()
+    if index is not None: return set(index.get("months", []))
+    shards = _legacy_history_shards()
+    for month, shard in shards.items(): save_history_shard(month, shard)
+    save_history_index(shards)
+    return set(shards)
+
+class HistorySession:
+    # Zbiera denne rozdelenia izieb v pamati a pri commit() zapise iba zmenene dni do aktualnej verzie mesacnych shardov.
+    # Mesiac, ktory sa nepodarilo precitat (unreadable), sa nezapise – zmeny v nom cakaju na dalsi commit()
+    # save=False (cli --dry-run): povodna historia sa na shardy nemigruje a commit() nic nezapise
+    def __init__(self, history=None, save=True):
+        self.shards, self.changed, self.unreadable = {}, {}, set()
+        self.months, self.index_failed, self.save = None, False, save
+        if history is not None:
+            self.months = set()
+            for date_key, room_map in history.items():
+                self.shards.setdefault(date_key[:7], {})[date_key] = room_map
+                self.months.add(date_key[:7])
+
+    @property
+    def dirty(self): return bool(self.changed)
+
+    def _known_months(self):
+        if self.months is None:
+            try:
+                if self.save or STORAGE_BACKEND == "sqlite": self.months = migrate_history_to_shards()
+                elif (index := load_history_index()) is not None: self.months = set(index.get("months", []))
+                else:
+                    # povodna historia ostane iba v pamati tejto session
+                    legacy = _legacy_history_shards()
+                    self.shards.update(legacy)
+                    self.months = set(legacy)
+                if STORAGE_BACKEND != "sqlite": self.months |= _local_history_months()
+            except:
+                # index nie je dostupny: shardy sa citaju bez ohladu na index a index sa neprepisuje
+                self.months, self.index_failed = set(), True
+        return self.months
+
+    def _shard(self, month):
+        known = self._known_months()
+        if month not in self.shards:
+            self.shards[month] = {}
+            if month in known or self.index_failed:
+                try: self.shards[month] = load_history_shard(month)
+                except: self.unreadable.add(month)
+        return self.shards[month]
+
+    def get(self, date_key, default=None): return self._shard(date_key[:7]).get(date_key, default)
+
+    def put(self, date_key, room_map):
+        shard = self._shard(date_key[:7])
+        if shard.get(date_key) != room_map:
+            shard[date_key] = room_map
+            self.changed.setdefault(date_key[:7], set()).add(date_key)
+
+    def clear(self):
+        for month in self._known_months() | set(self.shards):
+            if shard := self._shard(month):
+                self.changed.setdefault(month, set()).update(shard)
+                self.shards[month] = {}
+
+    def commit(self):
+        if not (self.changed and self.save): return False
+        known, written = self._known_months(), set()
+        for month, days in sorted(self.changed.items()):
+            if STORAGE_BACKEND != "sqlite":
+                # shard sa pred zapisom precita znova: dni, ktore medzitym zapisala ina session (UI, cron), ostanu
+                try: current = load_history_shard(month)
+                except:
+                    self.unreadable.add(month)
+                    continue
+                for day in days:
+                    if day in self.shards[month]: current[day] = self.shards[month][day]
+                    else: current.pop(day, None)
+                self.shards[month] = current
+                self.unreadable.discard(month)
+            save_history_shard(month, self.shards[month], days)
+            written.add(month)
+        if STORAGE_BACKEND != "sqlite" and not self.index_failed and not written <= known:
+            known |= written
+            try: save_history_index(known | set(migrate_history_to_shards()))
+            except: self.index_failed = True
+        self.changed = {m: days for m, days in self.changed.items() if m not in written}
+        return bool(written)
+
+    def __enter__(self): return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None: self.commit()
+
+# --- SQLITE ÚLOŽISKO ---
+DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS doctors (name TEXT PRIMARY KEY, pos INTEGER NOT NULL, active INTEGER NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS ambulances (name TEXT PRIMARY KEY, pos INTEGER NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS closures (date TEXT NOT NULL, target TEXT NOT NULL, PRIMARY KEY (date, target));
+CREATE TABLE IF NOT EXISTS room_history (date TEXT NOT NULL, doctor TEXT NOT NULL, rooms TEXT NOT NULL, PRIMARY KEY (date, doctor));
+"""
+
+@resource
+def _db():
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    conn.executescript(DB_SCHEMA)
+    lock = threading.RLock()
+    if conn.execute("SELECT COUNT(*) FROM doctors").fetchone()[0] == 0: import_db_from_gist(conn, lock)
+    return conn, lock
+
+def _dumps(v): return json.dumps(v, ensure_ascii=False, sort_keys=True)
+
+def _doctor_row(name, pos, props):
+    data = {k: v for k, v in props.items() if k != 'active'}
+    return name, pos, int(props.get('active', True)), _dumps(data)
+
+def _db_rows(config):
+    settings = {k: _dumps(v) for k, v in config.items() if k not in ('lekari', 'ambulancie', 'closures')}
+    doctors = {n: _doctor_row(n, i, p) for i, (n, p) in enumerate(config.get('lekari', {}).items())}
+    ambs = {n: (n, i, _dumps(p)) for i, (n, p) in enumerate(config.get('ambulancie', {}).items())}
+    closures = {(d, t) for d, targets in config.get('closures', {}).items() for t in targets}
+    return settings, doctors, ambs, closures
+
+def _db_write_config(conn, config):
+    # Prepise iba riadky, ktore sa zmenili
+    settings, doctors, ambs, closures = _db_rows(config)
+    old_settings = dict(conn.execute("SELECT key, value FROM settings"))
+    old_doctors = {r[0]: tuple(r) for r in conn.execute("SELECT name, pos, active, data FROM doctors")}
+    old_ambs = {r[0]: tuple(r) for r in conn.execute("SELECT name, pos, data FROM ambulances")}
+    old_closures = set(conn.execute("SELECT date, target FROM closures"))
+    conn.executemany("INSERT OR REPLACE INTO settings VALUES (?, ?)", [(k, v) for k, v in settings.items() if old_settings.get(k) != v])
+    conn.executemany("DELETE FROM settings WHERE key = ?", [(k,) for k in old_settings.keys() - settings.keys()])
+    conn.executemany("INSERT OR REPLACE INTO doctors VALUES (?, ?, ?, ?)", [r for n, r in doctors.items() if old_doctors.get(n) != r])
+    conn.executemany("DELETE FROM doctors WHERE name = ?", [(n,) for n in old_doctors.keys() - doctors.keys()])
+    conn.executemany("INSERT OR REPLACE INTO ambulances VALUES (?, ?, ?)", [r for n, r in ambs.items() if old_ambs.get(n) != r])
+    conn.executemany("DELETE FROM ambulances WHERE name = ?", [(n,) for n in old_ambs.keys() - ambs.keys()])
+    conn.executemany("INSERT INTO closures VALUES (?, ?)", sorted(closures - old_closures))
+    conn.executemany("DELETE FROM closures WHERE date = ? AND target = ?", sorted(old_closures - closures))
+
+def _db_write_history(conn, history, days):
+    for day in days:
+        conn.execute("DELETE FROM room_history WHERE date = ?", (day,))
+        conn.executemany("INSERT INTO room_history VALUES (?, ?, ?)", [(day, doc, _dumps(rooms)) for doc, rooms in history.get(day, {}).items()])
+
+def import_db_from_gist(conn=None, lock=None):
+    # Naplni databazu z gistu / lokalnych JSON suborov (prvy start alebo obnova zo zalohy)
+    if conn is None: conn, lock = _db()
+    config = _load_data(GIST_FILENAME_CONFIG, CONFIG_FILE, get_default_config)
+    months = set(_load_data(_shard_files("index")[1], _shard_files("index")[0], lambda: {}).get("months", []))
+    history = {}
+    for month in months: history.update(_load_data(_shard_files(month)[1], _shard_files(month)[0], lambda: {}))
+    if not months: history = _load_data(GIST_FILENAME_HISTORY, HISTORY_FILE, lambda: {})
+    with lock, conn:
+        _db_write_config(conn, config)
+        _db_write_history(conn, history, history.keys())
+    return config
+
+def export_db_to_gist():
+    # Zaloha databazy do gistu v rovnakom formate ako JSON rezim (config + mesacne shardy)
+    conn, lock = _db()
+    config = db_load_config()
+    write_local_json(CONFIG_FILE, config)
+    save_data_to_gist(GIST_FILENAME_CONFIG, config)
+    with lock: months = [r[0] for r in conn.execute("SELECT DISTINCT substr(date, 1, 7) FROM room_history ORDER BY 1")]
+    for month in months:
+        local_file, gist_file = _shard_files(month)
+        shard = db_load_history_range(f"{month}-01", f"{month}-31")
+        write_local_json(local_file, shard)
+        save_data_to_gist(gist_file, shard)
+    save_history_index(months)
+
+def db_load_config():
+    conn, lock = _db()
+    with lock:
+        config = {k: json.loads(v) for k, v in conn.execute("SELECT key, value FROM settings")}
+        config['lekari'] = {n: {**json.loads(d), 'active': bool(a)} for n, a, d in conn.execute("SELECT name, active, data FROM doctors ORDER BY pos")}
+        config['ambulancie'] = {n: json.loads(d) for n, d in conn.execute("SELECT name, data FROM ambulances ORDER BY pos")}
+        config['closures'] = {}
+        for d, t in conn.execute("SELECT date, target FROM closures ORDER BY date, target"): config['closures'].setdefault(d, []).append(t)
+    return config
+
+def db_save_config(config):
+    conn, lock = _db()
+    with lock, conn: _db_write_config(conn, config)
+
+def db_save_doctor(name, props):
+    conn, lock = _db()
+    with lock, conn:
+        row = _doctor_row(name, 0, props)
+        cur = conn.execute("UPDATE doctors SET active = ?, data = ? WHERE name = ?", (row[2], row[3], name))
+        if cur.rowcount == 0:
+            conn.execute("INSERT INTO doctors VALUES (?, (SELECT COALESCE(MAX(pos), -1) + 1 FROM doctors), ?, ?)", (name, row[2], row[3]))
+
+def db_closures_in_range(start_key, end_key):
+    conn, lock = _db()
+    closures = {}
+    with lock:
+        for d, t in conn.execute("SELECT date, target FROM closures WHERE date BETWEEN ? AND ? ORDER BY date, target", (start_key, end_key)):
+            closures.setdefault(d, []).append(t)
+    return closures
+
+def db_load_history_range(start_key, end_key):
+    conn, lock = _db()
+    history = {}
+    with lock:
+        for d, doc, rooms in conn.execute("SELECT date, doctor, rooms FROM room_history WHERE date BETWEEN ? AND ? ORDER BY date, doctor", (start_key, end_key)):
+            history.setdefault(d, {})[doc] = json.loads(rooms)
+    return history
+
+def db_save_history_days(history, days):
+    conn, lock = _db()
+    with lock, conn: _db_write_history(conn, history, days)
+
+def db_history_months():
+    conn, lock = _db()
+    with lock: return {r[0] for r in conn.execute("SELECT DISTINCT substr(date, 1, 7) FROM room_history")}
+
+def get_default_config():
+    return {
+        "total_beds": 42,
+        "closures": {}, 
+        # Oddelenia (izby, veduca, RT) a poradie spracovania/zobrazenia ambulancii
+        "wards": copy.deepcopy(DEFAULT_WARDS),
+        "amb_order": list(AMBS_ORDER),
+        "outlook_order": list(SCAN_AMBS),
+        "display_sections": copy.deepcopy(DISPLAY_SECTIONS),
+        "display_labels": dict(DISPLAY_LABELS),
+        # Zdroje neprítomností; voliteľne "type" (všetky udalosti jedného typu), "default_type", "aliases" {meno v kalendári: lekár}
+        "calendars": [{"name": "Hlavný kalendár", "url": PRIVATE_CALENDAR_URL}],
+        "absence_precedence": ABSENCE_PRECEDENCE,
+        "email_settings": { "default_to": "", "default_subject": "Rozpis služieb", "default_body": "Dobrý deň,\nv prílohe rozpis." },
+        "email_settings_absences": { "default_to": "", "default_subject": "Prehľad neprítomností", "default_body": "Dobrý deň,\nv prílohe posielam prehľad neprítomností." },
+        "ambulancie": {
+            "Konziliarna": { "dni": ["Pondelok", "Utorok", "Streda", "Stvrtok", "Piatok"], "priority": ["Kohutekova", "Kohutek", "Bystricky", "Zavrelova"] },
+            "Velka dispenzarna": { "dni": ["Pondelok", "Utorok", "Streda", "Stvrtok", "Piatok"], "priority": ["Bocak", "Stratena", "Vidulin", "Kurisova", "Blahova", "Hrabosova", "Miklatkova", "Martinka"] },
+            "Mala dispenzarna": { "dni": ["Pondelok", "Piatok"], "priority": ["Spanik", "Stratena", "Vidulin", "Kurisova", "Blahova", "Hrabosova", "Miklatkova"] },
+            "Radio 2A": { "dni": ["Pondelok", "Utorok", "Streda", "Stvrtok", "Piatok"], "priority": ["Zavrelova", "Kohutek", "Kurisova", "Miklatkova", "Bystricky"], "check_presence": ["Zavrelova", "Martinka"] },
+            "Radio 2B": { "dni": ["Pondelok", "Utorok", "Streda", "Stvrtok", "Piatok"], "priority": ["Martinka"], "conditional_owner": "Martinka" },
+            "Chemo 8A": { "dni": ["Pondelok", "Utorok", "Streda", "Stvrtok", "Piatok"], "priority": ["Hatalova", "Kohutek", "Stratena", "Bystricky"] },
+            "Chemo 8B": { "dni": ["Pondelok", "Utorok", "Streda", "Stvrtok", "Piatok"], "priority": ["Riedlova", "Kohutek", "Stratena", "Bystricky", "Vidulin", "Blahova"] },
+            "Chemo 8C": { "dni": ["Utorok", "Streda", "Stvrtok"], "priority": ["Stratena", "Kohutek", "Bystricky", "Vidulin", "Blahova"] },
+            "Wolf": { "dni": ["Pondelok", "Utorok", "Streda", "Stvrtok", "Piatok"], "priority": ["Spanik", "Miklatkova", "Kurisova", "Kohutek"], "follows": {"doctor": "Spanik", "ambulance": "Mala dispenzarna"} }
+        },
+        "lekari": {
+            "Bystricky": { "moze": ["Konziliarna", "Velka dispenzarna", "Mala dispenzarna", "Radio 2A", "Chemo 8A", "Chemo 8B", "Chemo 8C", "Wolf"], "active": True },
+            "Kohutek": { "moze": ["Oddelenie", "Konziliarna", "Velka dispenzarna", "Mala dispenzarna", "Radio 2A", "Chemo 8A", "Chemo 8B", "Chemo 8C", "Wolf"], "pevne_dni": {"Pondelok": "Chemo 8B", "Utorok": "Chemo 8B"}, "active": True },
+            "Kohutekova": { "moze": ["Konziliarna"], "pevne_dni": {"Pondelok": "Konziliarna", "Utorok": "Konziliarna", "Streda": "Konziliarna", "Stvrtok": "Konziliarna"}, "nepracuje": ["Piatok"], "active": True },
+            "Riedlova": { "moze": ["Chemo 8B"], "pevne_dni": {"Streda": "Chemo 8B", "Stvrtok": "Chemo 8B"}, "nepracuje": ["Pondelok", "Utorok"], "active": True },
+            "Zavrelova": { "moze": ["Radio 2A", "Konziliarna"], "pevne_dni": {"Pondelok": "Radio 2A", "Utorok": "Radio 2A", "Streda": "Radio 2A", "Stvrtok": "Radio 2A", "Piatok": "Radio 2A"}, "active": True },
+            "Martinka": { "moze": ["Radio 2B", "Oddelenie", "Velka dispenzarna"], "pevne_dni": {"Pondelok": "Radio 2B", "Utorok": "Radio 2B", "Streda": "Radio 2B", "Stvrtok": "Radio 2B", "Piatok": "Radio 2B"}, "active": True },
+            "Hatalova": { "moze": ["Chemo 8A"], "pevne_dni": {"Pondelok": "Chemo 8A", "Utorok": "Chemo 8A", "Streda": "Chemo 8A", "Stvrtok": "Chemo 8A", "Piatok": "Chemo 8A"}, "active": True },
+            "Stratena": { "moze": ["Oddelenie", "Velka dispenzarna", "Mala dispenzarna", "Chemo 8A", "Chemo 8B", "Chemo 8C"], "pevne_dni": {"Utorok": "Chemo 8C", "Streda": "Chemo 8C", "Stvrtok": "Chemo 8C"}, "active": True },
+            "Vidulin": { "moze": ["Oddelenie", "Velka dispenzarna", "Mala dispenzarna", "Chemo 8A", "Chemo 8B", "Chemo 8C"], "active": True },
+            "Miklatkova": { "moze": ["Oddelenie", "Wolf"], "active": True },
+            "Kurisova": { "moze": ["Oddelenie", "Velka dispenzarna", "Mala dispenzarna", "Radio 2A", "Wolf"], "special": "veduca", "active": True },
+            "Blahova": { "moze": ["Oddelenie", "Velka dispenzarna", "Mala dispenzarna", "Chemo 8B", "Chemo 8C"], "active": False },
+            "Hrabosova": { "moze": ["Oddelenie", "Velka dispenzarna", "Mala dispenzarna"], "active": False, "extra_dni": [] },
+            "Bocak": { "moze": ["Velka dispenzarna"], "pevne_dni": {"Pondelok": "Velka dispenzarna", "Utorok": "Velka dispenzarna", "Streda": "Velka dispenzarna", "Stvrtok": "Velka dispenzarna", "Piatok": "Velka dispenzarna"}, "active": True },
+            "Spanik": { "moze": ["Wolf", "Mala dispenzarna"], "pevne_dni": {"Pondelok": "Mala dispenzarna", "Utorok": "Wolf", "Streda": "Wolf", "Stvrtok": "Wolf", "Piatok": "Mala dispenzarna"}, "active": True },
+            "Kacurova": { "moze": ["Oddelenie"], "active": True },
+            "Hunakova": { "moze": ["Oddelenie"], "active": True }
+        }
+    }
+
+def migrate_homolova_to_vidulin(config):
+    changed = False
+    if "Homolova" in config["lekari"]:
+        config["lekari"]["Vidulin"] = config["lekari"].pop("Homolova")
+        changed = True
+    for amb_name, amb_data in config["ambulancie"].items():
+        if isinstance(amb_data["priority"], list):
+            if "Homolova" in amb_data["priority"]:
+                amb_data["priority"] = ["Vidulin" if x == "Homolova" else x for x in amb_data["priority"]]
+                changed = True
+        elif isinstance(amb_data["priority"], dict):
+            for day_key, day_list in amb_data["priority"].items():
+                if "Homolova" in day_list:
+                    amb_data["priority"][day_key] = ["Vidulin" if x == "Homolova" else x for x in day_list]
+                    changed = True
+    return config, changed
+
+def migrate_to_data_driven(config):
+    # Starsie konfiguracie mali izby, oddelenie, poradie ambulancii a pravidla Martinka/Spanik natvrdo v kode
+    changed = False
+    for key, default in (("wards", DEFAULT_WARDS), ("amb_order", AMBS_ORDER), ("outlook_order", SCAN_AMBS),
+                         ("display_sections", DISPLAY_SECTIONS), ("display_labels", DISPLAY_LABELS)):
+        if key not in config:
+            config[key] = copy.deepcopy(default)
+            changed = True
+    ambs = config["ambulancie"]
+    if "Radio 2B" in ambs and "conditional_owner" not in ambs["Radio 2B"]:
+        ambs["Radio 2B"]["conditional_owner"] = "Martinka"
+        changed = True
+    if "Wolf" in ambs and "follows" not in ambs["Wolf"]:
+        ambs["Wolf"]["follows"] = {"doctor": "Spanik", "ambulance": "Mala dispenzarna"}
+        changed = True
+    return changed
+
+def ward_names(config): return [w["name"] for w in config.get("wards") or DEFAULT_WARDS]
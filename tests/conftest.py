@@ -0,0 +1,5 @@
+# Moduly aplikacie lezia v koreni repozitara (bez balicka)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
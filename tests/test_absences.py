@@ -0,0 +1,90 @@
+# Nepritomnosti: prudovy citac iCal proti kniznici ics a intervalovy index proti linearnemu prechodu
+import os
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import absences
+from absences import AbsenceDays, AbsenceIndex, _parse_ical_events, classify_absence, get_ical_events
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "data", "absences.ics")
+WINDOW = datetime(2026, 10, 19), datetime(2026, 11, 2)
+
+def fixture_bytes():
+    with open(FIXTURE, 'rb') as f: return f.read()
+
+def test_parser_reads_fixture_events():
+    assert _parse_ical_events(fixture_bytes()) == [
+        (date(2026, 10, 19), date(2026, 10, 22), "Novak PN"),
+        (date(2026, 10, 21), date(2026, 10, 23), "Kralova - VZ"),
+        (date(2026, 10, 26), date(2026, 10, 31), "Horvath S"),
+        (date(2026, 10, 20), date(2026, 10, 21), "Kos"),
+        (date(2026, 10, 27), date(2026, 10, 29), "Benkova - dovolenka"),
+        (date(2026, 10, 23), date(2026, 10, 24), "Sedlak - kongres VZ"),
+        (date(2026, 11, 1), date(2026, 11, 5), "Mraz, Peter"),
+        (date(2025, 1, 1), date(2025, 1, 10), "Stary PN"),
+    ]
+
+def test_parser_matches_ics_library():
+    ics = pytest.importorskip("ics")
+    expected = sorted((e.begin.date(), e.end.date(), e.name.strip()) for e in ics.Calendar(fixture_bytes().decode()).events)
+    assert sorted(_parse_ical_events(fixture_bytes())) == expected
+
+def test_absence_days_match_per_day_expansion(monkeypatch):
+    # povodny vystup: kazda udalost rozbalena po dnoch v okne [start, end)
+    start, end = (d.date() for d in WINDOW)
+    expected = {}
+    for ev_start, ev_end, raw in _parse_ical_events(fixture_bytes()):
+        name, typ = classify_absence(raw)
+        day = max(ev_start, start)
+        while day < min(ev_end, end):
+            expected.setdefault(day.strftime('%Y-%m-%d'), {})[name] = typ
+            day += timedelta(days=1)
+    assert expected["2026-10-20"] == {"Novak": "PN", "Kos": "Dovolenka"}
+    assert expected["2026-10-23"] == {"Sedlak - kongres": "Vzdelávanie"}
+    assert expected["2026-10-27"] == {"Horvath": "Stáž", "Benkova": "Dovolenka"}
+    assert "2026-11-02" not in expected and not any(k.startswith("2025") for k in expected)
+
+    monkeypatch.setattr(absences, "load_calendar_events", lambda url, max_age: _parse_ical_events(fixture_bytes()))
+    result = get_ical_events(*WINDOW, [{"name": "test", "url": "fixture"}])
+    assert result.failed_sources == []
+    assert {k: dict(v) for k, v in result.items()} == expected
+
+PRECEDENCE = ["PN", "Vzdelávanie", "Stáž", "Dovolenka"]
+
+def random_intervals(rng, base=date(2026, 1, 1)):
+    intervals = []
+    for _ in range(rng.randint(0, 30)):
+        start = base + timedelta(days=rng.randint(0, 60))
+        intervals.append((rng.choice("ABCD"), start, start + timedelta(days=rng.randint(0, 10)), rng.choice(PRECEDENCE)))
+    return intervals
+
+@pytest.mark.parametrize("seed", range(100))
+def test_absence_index_matches_linear_scan(seed):
+    rng = random.Random(seed)
+    intervals = random_intervals(rng)
+    index = AbsenceIndex(intervals, PRECEDENCE)
+    valid = [iv for iv in intervals if iv[1] < iv[2]]
+    for _ in range(20):
+        start = date(2026, 1, 1) + timedelta(days=rng.randint(-5, 70))
+        end = start + timedelta(days=rng.randint(1, 14))
+        # [od, do) prekryva [start, end), ak od < end a do > start – interval konciaci v `start` alebo zacinajuci v `end` nie
+        expected = sorted((p, s_, e_, t) for p, s_, e_, t in valid if s_ < end and e_ > start)
+        assert sorted(index.overlapping(start, end)) == expected
+        for day in (start, end - timedelta(days=1)):
+            hits = {}
+            for seq, (p, s_, e_, t) in enumerate(valid):
+                if s_ <= day < e_ and (p not in hits or (-PRECEDENCE.index(t), seq) >= (-PRECEDENCE.index(hits[p][1]), hits[p][0])):
+                    hits[p] = (seq, t)
+            assert index.on(day) == {p: t for p, (_, t) in hits.items()}
+
+def test_absence_days_window_bounds():
+    index = AbsenceIndex([("A", date(2026, 3, 1), date(2026, 3, 5), "PN"), ("B", date(2026, 3, 5), date(2026, 3, 7), "Stáž"),
+                          ("C", date(2026, 2, 20), date(2026, 3, 2), "Dovolenka")], PRECEDENCE)
+    days = AbsenceDays(index, date(2026, 3, 2), date(2026, 3, 6))
+    assert list(days) == ["2026-03-02", "2026-03-03", "2026-03-04", "2026-03-05"]
+    assert days["2026-03-02"] == {"A": "PN"}
+    assert days["2026-03-05"] == {"B": "Stáž"}
+    for outside in ("2026-03-01", "2026-03-06", "zly-datum"):
+        assert outside not in days
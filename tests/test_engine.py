@@ -0,0 +1,67 @@
+# Regresne testy planovacich algoritmov proti hrubej sile na malych vstupoch
+import itertools
+import random
+
+import pytest
+
+from engine import _room_cost, _solve_rooms_exact, match_ambulances
+
+UNBOUNDED = (float('inf'),) * 3
+
+def room_case(rng):
+    docs = [f"L{i}" for i in range(rng.randint(1, 3))]
+    rooms = [(num, rng.randint(1, 3)) for num in sorted(rng.sample(range(1, 19), rng.randint(2, 6)))]
+    pinned = {d: [] for d in docs}
+    free = []
+    for room in rooms:
+        if rng.random() < 0.2: pinned[rng.choice(docs)].append(room)
+        else: free.append(room)
+    targets = {d: rng.randint(0, 9) for d in docs}
+    prev_owner = {num: rng.choice(docs) for num, _ in rooms if rng.random() < 0.5}
+    return docs, targets, pinned, free, prev_owner
+
+def best_cost(docs, targets, pinned, free, prev_owner):
+    best = None
+    for owners in itertools.product(docs, repeat=len(free)):
+        assignment = {d: list(pinned[d]) for d in docs}
+        for room, d in zip(free, owners): assignment[d].append(room)
+        cost = _room_cost(assignment, targets, prev_owner)
+        if best is None or cost < best: best = cost
+    return best
+
+@pytest.mark.parametrize("seed", range(200))
+def test_exact_room_solver_matches_exhaustive_search(seed):
+    docs, targets, pinned, free, prev_owner = room_case(random.Random(seed))
+    expected = best_cost(docs, targets, pinned, free, prev_owner)
+    result, stable = _solve_rooms_exact(docs, targets, pinned, free, prev_owner, UNBOUNDED, 10_000)
+    assert stable
+    assert sorted(r for rs in result.values() for r in rs) == sorted(free + [r for rs in pinned.values() for r in rs])
+    assert all(set(pinned[d]) <= set(result[d]) for d in docs)
+    assert _room_cost(result, targets, prev_owner) == expected
+    # nic lepsie nez optimum neexistuje
+    assert _solve_rooms_exact(docs, targets, pinned, free, prev_owner, expected, 10_000) == (None, True)
+
+def matching_score(slots, result):
+    # (pocet obsadenych ambulancii, -sucet poradi v priorite) – vacsie je lepsie
+    ranks = [cands.index(result[amb]) for amb, cands in slots if result[amb] is not None]
+    return len(ranks), -sum(ranks)
+
+def best_matching_score(slots):
+    best = (0, 0)
+    for picks in itertools.product(*[[None] + list(cands) for _, cands in slots]):
+        used = [p for p in picks if p is not None]
+        if len(used) == len(set(used)):
+            best = max(best, matching_score(slots, {amb: p for (amb, _), p in zip(slots, picks)}))
+    return best
+
+@pytest.mark.parametrize("seed", range(200))
+def test_match_ambulances_matches_brute_force(seed):
+    rng = random.Random(seed)
+    docs = [f"L{i}" for i in range(rng.randint(1, 5))]
+    slots = [(f"A{i}", rng.sample(docs, rng.randint(0, len(docs)))) for i in range(rng.randint(1, 5))]
+    result = match_ambulances(slots)
+    assert set(result) == {amb for amb, _ in slots}
+    assert all(doc is None or doc in cands for (amb, cands) in slots for doc in [result[amb]])
+    used = [doc for doc in result.values() if doc is not None]
+    assert len(used) == len(set(used))
+    assert matching_score(slots, result) == best_matching_score(slots)